@@ -1,17 +1,62 @@
 """
 Ali Integral Library
+
+Submodules and the physics entry points are imported on first access, so
+`import ali_integral` stays cheap (no numpy / scipy / matplotlib until
+they are needed). Matplotlib defaults to the headless Agg backend unless
+MPLBACKEND is already set.
 """
-from .physics import calculate_ali_integral, get_mass, BLACK_HOLES
+import importlib
+import os
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+_LAZY_ATTRS = {
+    "calculate_ali_integral": "physics",
+    "get_mass": "physics",
+    "BLACK_HOLES": "physics",
+}
+
+_SUBMODULES = (
+    "adaptive", "cache", "cli", "config", "eht_imaging", "information", "kernel", "kerr_metric",
+    "montecarlo", "pdf_generator", "physics", "pipeline", "plotting", "preview", "profiling",
+    "sensitivity", "streaming", "sweep", "utils", "visualizer", "visualizer_eht", "writers",
+)
+
+__all__ = ["run", *_LAZY_ATTRS]
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(f".{_LAZY_ATTRS[name]}", __name__)
+        value = getattr(module, name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS) | set(_SUBMODULES))
+
+def run(target="SgrA*", save=False, verbose=True):
+    """
+    Easy run function: Ali Integral (OFI) of a catalog name or mass.
+    Returns the value; verbose=False skips the printout and lets errors
+    propagate instead of printing them.
+    """
+    from .physics import calculate_ali_integral, get_mass
 
-def run(target="SgrA*", save=False):
-    """Easy run function"""
     try:
         mass = get_mass(target)
-        print(f"Target Mass: {mass:.2e}")
-        
         result = calculate_ali_integral(mass)
-        
-        print(f"Ali Integral (OFI): {result:.2e} bits")
-        return result
     except Exception as e:
-        print(f"Error: {e}")
\ No newline at end of file
+        if not verbose:
+            raise
+        print(f"Error: {e}")
+        return None
+
+    if verbose:
+        print(f"Target Mass: {mass:.2e}")
+        print(f"Ali Integral (OFI): {result:.2e} bits")
+    return result
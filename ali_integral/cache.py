@@ -0,0 +1,191 @@
+"""
+Result cache for the physics runs.
+
+Results are keyed on a SHA-256 of every input: the call arguments, the
+model constants (B0, SNR0, C_LIMIT, T_SPACE, T_MELT, F_CRIT, STEPS,
+SIMULATION_STEPS, HOLES)
+and the source of the physics modules and config.py, so editing either
+invalidates the entry. Entries live in a bounded in-process LRU and,
+optionally, in a content-addressed on-disk store
+(output/cache/<key[:2]>/<key>.pkl) that is evicted oldest-first once it
+grows past its size budget. The store is only walked when the running
+size estimate exceeds the budget (and on the first write).
+"""
+import copy
+import hashlib
+import json
+import os
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+
+from . import config, kerr_metric, physics
+
+CACHE_DIR = "output/cache"
+MAX_ENTRIES = 128               # In-process LRU size
+MAX_DISK_BYTES = 256 * 2**20    # On-disk store budget
+
+def _canonical(obj):
+    # JSON-safe, order-stable view of the inputs (floats keep every bit)
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in sorted(obj.items())}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        return {"dtype": arr.dtype.str, "shape": arr.shape, "sha": hashlib.sha256(arr.tobytes()).hexdigest()}
+    if isinstance(obj, (float, np.floating)):
+        return float(obj).hex()
+    if isinstance(obj, np.integer):
+        return int(obj)
+    return obj
+
+def _source_digest():
+    h = hashlib.sha256()
+    for module in (physics, kerr_metric, config):
+        with open(module.__file__, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+_SOURCE_DIGEST = _source_digest()
+
+def model_constants():
+    """Snapshot of the physics constants that feed every run."""
+    return {
+        "B0": physics.B0,
+        "SNR0": physics.SNR0,
+        "C_LIMIT": physics.C_LIMIT,
+        "T_SPACE": physics.T_SPACE,
+        "T_MELT": physics.T_MELT,
+        "F_CRIT": physics.F_CRIT,
+        "STEPS": physics.STEPS,
+        "SIMULATION_STEPS": physics.SIMULATION_STEPS,
+        "HOLES": physics.HOLES,
+    }
+
+def cache_key(func_name, **inputs):
+    payload = {
+        "func": func_name,
+        "inputs": inputs,
+        "constants": model_constants(),
+        "source": _SOURCE_DIGEST,
+    }
+    blob = json.dumps(_canonical(payload), sort_keys=True).encode()
+    return hashlib.sha256(blob).hexdigest()
+
+class ResultCache:
+    def __init__(self, max_entries=MAX_ENTRIES, disk_dir=None, max_disk_bytes=MAX_DISK_BYTES):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._disk_bytes = None     # Store size estimate, None until first walked
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.pkl")
+
+    def get(self, key):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(self._memory[key])
+
+        if self.disk_dir:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    value = pickle.load(f)
+                os.utime(path)  # Recently used: survives eviction longer
+            except (OSError, pickle.UnpicklingError, EOFError):
+                value = None
+            if value is not None:
+                self._remember(key, value)
+                self.hits += 1
+                return copy.deepcopy(value)
+
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._remember(key, copy.deepcopy(value))
+
+        if self.disk_dir:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                written = f.tell()
+            os.replace(tmp, path)
+            if self._disk_bytes is not None:
+                self._disk_bytes += written - replaced
+            # Other processes' writes are only seen by the next full walk
+            if self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if name.endswith(".pkl"):
+                    path = os.path.join(root, name)
+                    st = os.stat(path)
+                    entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(path)
+            total -= size
+        self._disk_bytes = total
+
+    def clear(self, disk=False):
+        self._memory.clear()
+        if disk and self.disk_dir:
+            for root, _, files in os.walk(self.disk_dir):
+                for name in files:
+                    if name.endswith(".pkl"):
+                        os.remove(os.path.join(root, name))
+            self._disk_bytes = 0
+
+_CACHE = ResultCache()
+
+def configure(max_entries=MAX_ENTRIES, disk_dir=None, max_disk_bytes=MAX_DISK_BYTES):
+    """Replace the shared cache; pass disk_dir (e.g. CACHE_DIR) to persist."""
+    global _CACHE
+    _CACHE = ResultCache(max_entries, disk_dir, max_disk_bytes)
+    return _CACHE
+
+def get_cache():
+    return _CACHE
+
+def _memoized(func_name, compute, **inputs):
+    key = cache_key(func_name, **inputs)
+    value = _CACHE.get(key)
+    if value is None:
+        value = compute()
+        _CACHE.put(key, value)
+    return value
+
+def calculate_ali_integral(mass):
+    """Cached physics.calculate_ali_integral."""
+    mass = np.asarray(mass, dtype=float) if np.ndim(mass) else float(mass)
+    return _memoized("calculate_ali_integral", lambda: physics.calculate_ali_integral(mass), mass=mass)
+
+def run_simulation():
+    """Cached physics.run_simulation."""
+    return _memoized("run_simulation", physics.run_simulation)
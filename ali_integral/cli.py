@@ -0,0 +1,162 @@
+"""
+`ali-integral` command line entry point.
+
+    ali-integral compute TARGET [--spin A] [--steps N] [--json]
+    ali-integral sweep --grid M=10,4e6 --grid a=0,0.99 [--output table.csv] [-j N]
+    ali-integral render {infall,perturbation,shadow,all} [--lod N] [-j N]
+    ali-integral report [--force] [-j N]
+    ali-integral report --catalog [--output-dir output/reports]
+    ali-integral --profile trace.json [--profile-memory] COMMAND ...
+
+Each subcommand imports only the modules it needs (compute never touches
+matplotlib, imageio or fpdf), which keeps cold starts short when the tool
+is called from scripts. --profile records a Chrome trace and prints the
+per-span summary to stderr (see profiling).
+"""
+import argparse
+import json
+import sys
+
+def _parse_target(target):
+    try:
+        return float(target)
+    except ValueError:
+        return target
+
+def _compute(args):
+    from . import physics
+
+    target = _parse_target(args.target)
+    spin = args.spin
+    if spin is None and args.model == "kerr":
+        if target not in physics.HOLES:
+            raise ValueError(f"No spin for '{target}'. Pass --spin or use one of: {list(physics.HOLES)}")
+        spin = physics.HOLES[target]["a"]
+
+    if spin is None:
+        mass = physics.get_mass(target)
+        out = {"model": "flux", "mass": mass, "I_Ali": float(physics.calculate_ali_integral(mass))}
+    else:
+        mass = physics.HOLES[target]["M"] if target in physics.HOLES else physics.get_mass(target)
+        res = physics.simulate_hole(mass, spin, steps=args.steps)
+        out = {"model": "kerr", "mass": mass, "a": spin, "I_Ali": float(res["I_Ali"]),
+               "crash_val": float(res["crash_val"])}
+    out["target"] = args.target
+
+    if args.json:
+        print(json.dumps(out))
+    else:
+        print(f"{out['I_Ali']:.6e}")
+
+def _parse_grid(items):
+    grid = {}
+    for item in items:
+        name, sep, values = item.partition("=")
+        if not sep:
+            raise ValueError(f"Bad --grid entry '{item}', expected name=v1,v2,...")
+        grid[name.strip()] = [float(v) for v in values.split(",") if v.strip()]
+    return grid
+
+def _sweep(args):
+    from .sweep import run_sweep
+
+    table = run_sweep(_parse_grid(args.grid), steps=args.steps, processes=args.processes, output=args.output)
+    if args.output is None:
+        print(",".join(table.dtype.names))
+        for row in table:
+            print(",".join(repr(v.item()) for v in row))
+
+def _render(args):
+    targets = ("infall", "perturbation", "shadow") if args.target == "all" else (args.target,)
+    for target in targets:
+        if target == "infall":
+            from .visualizer import create_animation
+            create_animation(processes=args.processes, lod=args.lod)
+        elif target == "perturbation":
+            from .visualizer_eht import generate_eht_animation
+            generate_eht_animation(processes=args.processes, lod=args.lod)
+        else:
+            from .eht_imaging import generate_shadow_image
+            impact = args.impact
+            if impact is None:
+                from . import cache
+                from .pipeline import impact_factor
+                cache.configure(disk_dir=cache.CACHE_DIR)
+                impact = impact_factor(cache.run_simulation())
+            generate_shadow_image(impact, lod=args.lod)
+
+def _report(args):
+    if not args.catalog:
+        from .pipeline import build
+        build(processes=args.processes, force=args.force)
+        return
+
+    from . import cache
+    from .pdf_generator import ReportEngine
+    from .utils import download_font
+    font_path = download_font()
+    if not font_path:
+        raise RuntimeError("Font download failed")
+    cache.configure(disk_dir=cache.CACHE_DIR)
+    ReportEngine(font_path).catalog(cache.run_simulation(), output_dir=args.output_dir, processes=args.processes)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="ali-integral", description="Ali Integral toolkit.")
+    parser.add_argument("--profile", metavar="TRACE.json", default=None,
+                        help="record spans and write a Chrome / Perfetto trace")
+    parser.add_argument("--profile-memory", action="store_true", help="also record tracemalloc peaks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("compute", help="I_Ali of one target (catalog name or mass in solar masses)")
+    p.add_argument("target")
+    p.add_argument("--spin", type=float, default=None, help="Kerr spin; selects the thermal-crash model")
+    p.add_argument("--model", choices=("flux", "kerr"), default="flux",
+                   help="kerr without --spin takes the spin of a physics.HOLES entry")
+    p.add_argument("--steps", type=int, default=None)
+    p.add_argument("--json", action="store_true", help="print a JSON object instead of the bare value")
+    p.set_defaults(func=_compute)
+
+    p = sub.add_parser("sweep", help="simulate_hole over a parameter grid")
+    p.add_argument("--grid", action="append", required=True, metavar="NAME=V1,V2,...",
+                   help="sweep axis (M and a are required); repeat per parameter")
+    p.add_argument("--steps", type=int, default=None)
+    p.add_argument("--output", default=None, help=".npy or .csv table (default: CSV on stdout)")
+    p.add_argument("-j", "--processes", type=int, default=None)
+    p.set_defaults(func=_sweep)
+
+    p = sub.add_parser("render", help="animations and the EHT shadow figure")
+    p.add_argument("target", choices=("infall", "perturbation", "shadow", "all"))
+    p.add_argument("--lod", type=int, default=1, help="preview level of detail (1 = full quality)")
+    p.add_argument("--impact", type=float, default=None, help="I_Ali_normalized for the shadow")
+    p.add_argument("-j", "--processes", type=int, default=1)
+    p.set_defaults(func=_render)
+
+    p = sub.add_parser("report", help="incremental build of every artifact and the PDF")
+    p.add_argument("--force", action="store_true")
+    p.add_argument("--catalog", action="store_true", help="one short report per physics.HOLES target instead")
+    p.add_argument("--output-dir", default="output/reports", help="directory of the --catalog reports")
+    p.add_argument("-j", "--processes", type=int, default=None)
+    p.set_defaults(func=_report)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "compute" and args.steps is not None and args.spin is None and args.model == "flux":
+        # calculate_ali_integral integrates on the fixed config.STEPS grid
+        parser.error("--steps only applies to the kerr model (--model kerr or --spin)")
+    if args.profile:
+        from . import profiling
+        profiling.enable(memory=args.profile_memory)
+    try:
+        args.func(args)
+    except (ValueError, KeyError, RuntimeError, OSError) as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.profile:
+            profiling.report(args.profile)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
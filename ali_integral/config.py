@@ -5,6 +5,11 @@ STEPS = 5000            # Precision of the integration
 R_START = 1.0           # Horizon (2M normalized)
 R_END = 1e-5            # Singularity approach
 
+# --- Rendering ---
+IMAGE_DTYPE = "float32"  # Float dtype of image buffers ("float64" for the legacy pipeline)
+PREVIEW_LOD = 4          # Resolution / frame-count divisor of preview renders
+PREVIEW_DIR = "output/preview"
+
 # --- Physical Parameters ---
 B0 = 1.0e9              # Base Detector Bandwidth (Hz)
 SNR0 = 10.0             # Initial Signal-to-Noise Ratio
@@ -1,44 +1,234 @@
+"""
+EHT shadow images.
+
+generate_shadow_image draws the 500 px comparison figure. render_tiled
+builds the accretion-disk intensity tile by tile into a np.memmap, so
+8K+ images need memory bounded by the tile size; tiles can be rendered
+on a process pool (each worker writes its own tile into the shared map).
+render_shadow_hires colour-maps the map band by band into a streamed PNG.
+
+ShadowField caches the radius-independent fields (R_impact, Doppler
+weighting) so perturbation sweeps over many shadow radii only redo the
+masked select.
+"""
+import os
+
 import numpy as np
 import matplotlib.pyplot as plt
+from .profiling import span, traced
+from .utils import image_dtype, output_root, parallel_map
+from .writers import write_png_stream
+
+EXTENT = 10.0               # Image half-width in units of M
+R_SHADOW_CLASSIC = 5.196    # Schwarzschild shadow radius (3*sqrt(3) M)
+EPSILON = 0.05              # Shadow perturbation per unit I_Ali_normalized
+RING_WIDTH = 0.5
+TILE = 1024                 # Tile edge in pixels for render_tiled
+BATCH_CHUNK = 16            # Shadow radii broadcast together in render_batch
+BAND_ROWS = 256             # Rows colour-mapped per PNG band
+
+class ShadowField:
+    """
+    Radius-independent fields of the accretion-disk model on one grid:
+    R_impact and the Doppler-weighted disk / ring brightness. Any number of
+    shadow radii are then a masked select, with results bit-identical to
+    rendering each radius from scratch.
+    """
+    def __init__(self, x, y):
+        X, Y = np.meshgrid(x, y)
+        # Not np.hypot: it can differ in the last ulp and move the shadow edge
+        self.R_impact = np.sqrt(X**2 + Y**2)
+
+        # Doppler boost (approaching side brighter)
+        doppler = X / np.sqrt(X**2 + Y**2 + 0.1)
+        doppler *= 0.5
+        doppler += 1
+
+        with np.errstate(divide="ignore"):
+            disk = 10.0 / (self.R_impact**2)
+        self.lit = disk * doppler
+        disk += 50.0
+        self.ring = disk * doppler
+
+    @property
+    def shape(self):
+        return self.R_impact.shape
+
+    def _bounds(self, r_shadow):
+        # Shadow edge and outer ring edge in the grid dtype, so single and
+        # batched renders compare at the same precision
+        r_shadow = np.asarray(r_shadow, dtype=float)
+        dtype = self.R_impact.dtype
+        return r_shadow.astype(dtype), (r_shadow + RING_WIDTH).astype(dtype)
+
+    def render(self, r_shadow, out=None):
+        R = self.R_impact
+        out = np.zeros_like(R) if out is None else out
+        inner, outer = self._bounds(r_shadow)
+        mask_light = R > inner
+        mask_ring = mask_light & (R < outer)
+        np.copyto(out, 0)
+        np.copyto(out, self.lit, where=mask_light)
+        np.copyto(out, self.ring, where=mask_ring)
+        return out
+
+    @traced("eht_imaging.render_batch")
+    def render_batch(self, r_shadows, out=None, path=None, chunk=BATCH_CHUNK):
+        """
+        Images for every radius in r_shadows, stacked as (N, H, W). Radii
+        are broadcast chunk at a time; out may be a preallocated array and
+        path writes the stack to a np.memmap instead of RAM.
+        """
+        r_shadows = np.asarray(r_shadows, dtype=float).ravel()
+        shape = (len(r_shadows),) + self.shape
+        if out is None and path is not None:
+            out = np.lib.format.open_memmap(path, mode="w+", dtype=self.R_impact.dtype, shape=shape)
+        elif out is None:
+            out = np.empty(shape, dtype=self.R_impact.dtype)
+
+        R = self.R_impact
+        for start in range(0, len(r_shadows), chunk):
+            inner, outer = self._bounds(r_shadows[start:start + chunk, None, None])
+            mask_light = R > inner
+            mask_ring = mask_light & (R < outer)
+            block = out[start:start + len(inner)]
+            block[...] = 0
+            np.copyto(block, self.lit, where=mask_light)
+            np.copyto(block, self.ring, where=mask_ring)
+        return out
+
+    def difference(self, r_shadow, r_reference=R_SHADOW_CLASSIC):
+        """'Ali Deviation' map: image at r_shadow minus the reference image."""
+        return self.render(r_shadow) - self.render(r_reference)
+
+_FIELDS = {}
+
+def shadow_field(res, dtype=None):
+    """Cached ShadowField on the standard [-EXTENT, EXTENT]^2 grid."""
+    key = (res, image_dtype(dtype))
+    if key not in _FIELDS:
+        axis = np.linspace(-EXTENT, EXTENT, res, dtype=key[1])
+        _FIELDS[key] = ShadowField(axis, axis)
+    return _FIELDS[key]
+
+def disk_intensity(x, y, r_shadow):
+    """
+    Accretion-disk intensity on the grid x (columns) by y (rows).
+    x and y may be any sub-range of the full axis, so a tile of the tiled
+    renderer is bit-identical to the same pixels of a full render.
+    """
+    return ShadowField(x, y).render(r_shadow)
+
+def perturbation_sweep(I_values, epsilon=EPSILON, res=500, path=None, chunk=BATCH_CHUNK):
+    """
+    Shadow images for many I_Ali_normalized values at once (one cached
+    ShadowField). Returns {"r_shadow", "images" (N, res, res), "rms_deviation"}
+    where rms_deviation is the RMS difference from the GR image per value.
+    path stores the image stack as a .npy memmap.
+    """
+    I_values = np.asarray(I_values, dtype=float).ravel()
+    field = shadow_field(res)
+
+    r_shadow = R_SHADOW_CLASSIC * (1 + epsilon * I_values)
+    images = field.render_batch(r_shadow, path=path, chunk=chunk)
+
+    classic = field.render(R_SHADOW_CLASSIC)
+    rms = np.empty(len(r_shadow))
+    for i, image in enumerate(images):
+        rms[i] = np.sqrt(np.mean((image - classic)**2, dtype=np.float64))
 
-def generate_shadow_image(I_Ali_normalized, output_dir="output"):
+    return {"r_shadow": r_shadow, "images": images, "rms_deviation": rms}
+
+def _tile_bounds(res, tile):
+    return [(r0, min(r0 + tile, res), c0, min(c0 + tile, res))
+            for r0 in range(0, res, tile) for c0 in range(0, res, tile)]
+
+@traced("eht_imaging.tile")
+def _render_tile(args):
+    path, res, dtype, r_shadow, (r0, r1, c0, c1) = args
+    axis = np.linspace(-EXTENT, EXTENT, res, dtype=dtype)
+    intensity = disk_intensity(axis[c0:c1], axis[r0:r1], r_shadow)
+
+    image = np.memmap(path, dtype=dtype, mode="r+", shape=(res, res))
+    image[r0:r1, c0:c1] = intensity
+    image.flush()
+    del image
+    return float(intensity.min()), float(intensity.max())
+
+def render_tiled(r_shadow, res, path, tile=TILE, processes=1, dtype=None):
+    """
+    Render the disk intensity for shadow radius r_shadow into a (res, res)
+    np.memmap at path, tile x tile pixels at a time. processes > 1 (or None
+    for all cores) renders tiles in parallel. Returns (memmap, (min, max)).
+    """
+    dtype = image_dtype(dtype)
+    image = np.memmap(path, dtype=dtype, mode="w+", shape=(res, res))
+    image.flush()
+
+    tasks = [(path, res, dtype, r_shadow, b) for b in _tile_bounds(res, tile)]
+    ranges = list(parallel_map(_render_tile, tasks, processes=processes))
+    lo = min(r[0] for r in ranges)
+    hi = max(r[1] for r in ranges)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(res, res)), (lo, hi)
+
+@traced()
+def render_shadow_hires(I_Ali_normalized, res=8192, output_dir="output", tile=TILE,
+                        processes=1, cmap="inferno", keep_map=False):
+    """
+    High-resolution 'Ali Hypothesis' shadow image written as
+    {output_dir}/eht_shadow_{res}.png. The raw float intensity map
+    (eht_shadow_{res}.dat) is deleted afterwards unless keep_map is set.
+    """
+    from matplotlib import colormaps
+
+    print(f"[INFO] Rendering {res}x{res} EHT shadow ({tile}px tiles)...")
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    r_shadow = R_SHADOW_CLASSIC * (1 + EPSILON * I_Ali_normalized)
+    map_path = f"{output_dir}/eht_shadow_{res}.dat"
+    image, (lo, hi) = render_tiled(r_shadow, res, map_path, tile=tile, processes=processes)
+
+    colormap = colormaps[cmap]
+    scale = 1.0 / (hi - lo) if hi > lo else 0.0
+
+    def bands():
+        for r0 in range(0, res, BAND_ROWS):
+            band = (np.asarray(image[r0:r0 + BAND_ROWS], dtype=np.float32) - lo) * scale
+            yield colormap(band, bytes=True)[..., :3]
+
+    png_path = f"{output_dir}/eht_shadow_{res}.png"
+    write_png_stream(png_path, res, res, bands())
+
+    del image
+    if not keep_map:
+        os.remove(map_path)
+
+    print(f"[SUCCESS] High-resolution shadow saved: {png_path}")
+    return png_path
+
+@traced()
+def generate_shadow_image(I_Ali_normalized, output_dir=None, lod=1):
+    """
+    Three-panel GR / Ali / deviation figure (fig3_eht_shadow.png).
+    lod > 1 is a preview at 1/lod of the grid resolution and dpi, written
+    to config.PREVIEW_DIR unless output_dir is given.
+    """
     print("[INFO] Generating EHT Shadow Simulation...")
+    output_dir = output_dir or output_root(lod)
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
     
-    RES = 500
-    x = np.linspace(-10, 10, RES)
-    y = np.linspace(-10, 10, RES)
-    X, Y = np.meshgrid(x, y)
-    
-    R_impact = np.sqrt(X**2 + Y**2)
-    
-    R_shadow_classic = 5.196
-    
-    EPSILON = 0.05
+    RES = 500 // lod
     
     perturbation = EPSILON * I_Ali_normalized
-    R_shadow_ali = R_shadow_classic * (1 + perturbation)
-    
-    # --- Image Generation ---
+    R_shadow_ali = R_SHADOW_CLASSIC * (1 + perturbation)
     
-    def render_accretion_disk(r_shadow):
-        intensity = np.zeros_like(R_impact)
-        
-        mask_light = R_impact > r_shadow
-        
-        intensity[mask_light] = 10.0 / (R_impact[mask_light]**2)
-        
-        ring_width = 0.5
-        mask_ring = (R_impact > r_shadow) & (R_impact < r_shadow + ring_width)
-        intensity[mask_ring] += 50.0
-        
-        doppler = 1 + 0.5 * (X / np.sqrt(X**2 + Y**2 + 0.1))
-        intensity = intensity * doppler
-        
-        return intensity
-
-    # Render
-    img_classic = render_accretion_disk(R_shadow_classic)
-    img_ali = render_accretion_disk(R_shadow_ali)
+    # Render (both images and the deviation from one cached field)
+    field = shadow_field(RES)
+    img_classic, img_ali = field.render_batch([R_SHADOW_CLASSIC, R_shadow_ali])
+    deviation = img_ali - img_classic
+    limit = float(np.abs(deviation).max()) or 1.0
     
     # --- Visualization ---
     
@@ -56,13 +246,16 @@ def generate_shadow_image(I_Ali_normalized, output_dir="output"):
     ax2.axis('off')
     
     ax3 = axes[2]
+    ax3.imshow(deviation, extent=[-10,10,-10,10], cmap='seismic', vmin=-limit, vmax=limit)
     ax3.set_title('The "Ali Deviation" Signal')
     ax3.axis('off')
     
     ax3.text(0, -8, "Look Here for Quantum Echo", color='cyan', ha='center')
     
     plt.tight_layout()
-    plt.savefig(f"{output_dir}/fig3_eht_shadow.png", dpi=300)
+    with span("savefig", path=f"{output_dir}/fig3_eht_shadow.png"):
+        plt.savefig(f"{output_dir}/fig3_eht_shadow.png", dpi=300 // lod)
     plt.close()
     
-    print("[SUCCESS] EHT Shadow generated.")
\ No newline at end of file
+    print("[SUCCESS] EHT Shadow generated.")
+    return f"{output_dir}/fig3_eht_shadow.png"
\ No newline at end of file
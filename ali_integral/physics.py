@@ -1,6 +1,6 @@
 import numpy as np
-from scipy.integrate import simpson
 from .kerr_metric import calculate_horizons, kerr_blueshift_factor
+from .profiling import traced
 try:
     from ali_integral.config import B0, SNR0, C_LIMIT, F_CRIT, STEPS, T_MELT, T_SPACE
 except ImportError:
@@ -9,6 +9,8 @@ except ImportError:
     C_LIMIT = 1.0e17
     T_SPACE = 2.7
     T_MELT = 3500.0
+    F_CRIT = 1.0e14
+    STEPS = 5000
 
 BLACK_HOLES = {
     "SgrA*": 4.1e6,
@@ -23,6 +25,7 @@ HOLES = {
     "Sgr A*":     {"M": 4.0e6, "a": 0.6},
     "TON 618":    {"M": 6.6e10, "a": 0.99}
 }
+SIMULATION_STEPS = 5000     # run_simulation grid (fixed, independent of config.STEPS)
 
 def get_mass(mass_input):
     if isinstance(mass_input, str):
@@ -32,13 +35,25 @@ def get_mass(mass_input):
             raise ValueError(f"Unknown Black Hole. Available: {list(BLACK_HOLES.keys())}")
     return float(mass_input)
 
-def calculate_ali_integral(mass):
-    M = float(mass)
-    
+BATCH_CHUNK = 256       # Masses per broadcasted block (bounds the tau matrix)
+
+@traced()
+def calculate_ali_integral(mass, return_crash_index=False):
+    """
+    Ali Integral for one mass or an array of masses.
+
+    The r grid, blueshift, flux and capacity do not depend on mass, so they
+    are built once and only tau is scaled per mass. An array of masses is
+    integrated in broadcasted blocks of BATCH_CHUNK rows and returns a NumPy
+    array of the input shape; a scalar returns a float as before.
+    """
+    from scipy.integrate import simpson
+
+    masses = np.asarray(mass, dtype=float)
+    flat = masses.reshape(-1)
+
     # r normalized: 1.0 (Horizon) -> 0 (Singularity)
     r = np.linspace(1.0, 1e-5, STEPS)
-    # Proper time tau scales with Mass M
-    tau = np.linspace(0, M, STEPS)
     
     g_factor = 1.0 / r
     B_tau = B0 * g_factor
@@ -50,77 +65,130 @@ def calculate_ali_integral(mass):
     crash_mask = Flux > F_CRIT
     
     if np.any(crash_mask):
-        crash_idx = np.argmax(crash_mask)
+        crash_idx = int(np.argmax(crash_mask))
     else:
         crash_idx = STEPS - 1
+
+    I_Ali = np.zeros(flat.shape)
+
+    if crash_idx >= 2:
+        throughput = np.minimum(C_in[:crash_idx], C_LIMIT)
+
+        for start in range(0, flat.size, BATCH_CHUNK):
+            block = flat[start:start + BATCH_CHUNK]
+            # Proper time tau scales with Mass M (one row per mass)
+            valid_tau = np.linspace(0, block, STEPS, axis=-1)[:, :crash_idx]
+            I_Ali[start:start + BATCH_CHUNK] = simpson(
+                np.broadcast_to(throughput, valid_tau.shape), x=valid_tau, axis=-1
+            )
+
+    if masses.ndim == 0:
+        I_Ali = float(I_Ali[0])
+        crash_indices = crash_idx
+    else:
+        I_Ali = I_Ali.reshape(masses.shape)
+        crash_indices = np.full(masses.shape, crash_idx)
+
+    if return_crash_index:
+        return I_Ali, crash_indices
+    return I_Ali
+
+def resolve_params(steps=None, b0=None, snr0=None, c_limit=None,
+                   t_melt=None, t_space=None, f_crit=None):
+    """simulate_hole parameters with None replaced by the current constants."""
+    return {
+        "steps": STEPS if steps is None else int(steps),
+        "b0": B0 if b0 is None else b0,
+        "snr0": SNR0 if snr0 is None else snr0,
+        "c_limit": C_LIMIT if c_limit is None else c_limit,
+        "t_melt": T_MELT if t_melt is None else t_melt,
+        "t_space": T_SPACE if t_space is None else t_space,
+        "f_crit": f_crit,
+    }
+
+@traced()
+def simulate_hole(M, a, steps=None, b0=None, snr0=None, c_limit=None,
+                  t_melt=None, t_space=None, f_crit=None, table=None):
+    """
+    Thermal-crash model of a single Kerr hole (one entry of run_simulation).
+
+    Parameters left as None take the current module constants, so the
+    defaults reproduce run_simulation exactly while STEPS equals
+    SIMULATION_STEPS. f_crit adds the structural
+    crash condition Flux = g^2 > f_crit on top of the thermal one; it is
+    disabled (None) by default. table (a kerr_metric.BlueshiftTable)
+    replaces the exact metric evaluation with an interpolated lookup.
+    """
+    # scipy is imported on first use to keep `import ali_integral` light
+    from scipy.integrate import simpson, cumulative_trapezoid
+
+    p = resolve_params(steps, b0, snr0, c_limit, t_melt, t_space)
+    steps, b0, snr0 = p["steps"], p["b0"], p["snr0"]
+    c_limit, t_melt, t_space = p["c_limit"], p["t_melt"], p["t_space"]
+
+    r_plus, r_minus = calculate_horizons(1.0, a)
+    
+    r_start = r_plus * 0.99
+    
+    r = np.linspace(r_start, r_minus + 0.0001, steps)
+    tau = np.linspace(0, M, steps)
+    
+    if table is not None:
+        g_factor = table(r, a)
+    else:
+        g_factor = kerr_blueshift_factor(r, 1.0, a)
+    
+    g_factor = np.nan_to_num(g_factor, nan=1.0)
+    
+    Temperature = t_space * np.sqrt(g_factor) * 100 
+    
+    B_tau = b0 * g_factor
+    SNR_tau = snr0 * g_factor
+    C_in = B_tau * np.log2(1 + SNR_tau)
+    
+    crash_mask = Temperature > t_melt
+    if f_crit is not None:
+        crash_mask |= g_factor**2 > f_crit
+    
+    if np.any(crash_mask):
+        crash_idx = np.argmax(crash_mask)
+    else:
+        crash_idx = steps - 1
+        
+    if crash_idx == 0:
+        crash_idx = 1
         
     valid_tau = tau[:crash_idx]
     valid_Cin = C_in[:crash_idx]
     
-    if len(valid_tau) < 2:
-        return 0.0
-    
-    throughput = np.minimum(valid_Cin, C_LIMIT)
+    throughput = np.minimum(valid_Cin, c_limit)
     
-    I_Ali = simpson(throughput, x=valid_tau)
-    
-    return I_Ali
+    # Integral Ali
+    if len(valid_tau) > 1:
+        I_Ali = simpson(throughput, x=valid_tau)
+        # Bits decoded by each tau (see information.InformationIndex)
+        cumulative = cumulative_trapezoid(throughput, x=valid_tau, initial=0.0)
+    else:
+        I_Ali = 0.0
+        cumulative = np.zeros(len(valid_tau))
+        
+    last_val = valid_tau[-1] if len(valid_tau) > 0 else 0.0
+
+    return {
+        "I_Ali": I_Ali,
+        "tau": valid_tau,
+        "Cin": valid_Cin,
+        "limit": c_limit,
+        "crash_val": last_val,
+        "temp": Temperature[:crash_idx],
+        "cumulative": cumulative
+    }
 
+@traced()
 def run_simulation():
     results = {}
 
     for name, params in HOLES.items():
-        M = params["M"]
-        a = params["a"]
-        
-        r_plus, r_minus = calculate_horizons(1.0, a)
-        
-        r_start = r_plus * 0.99
-        
-        steps = 5000
-        r = np.linspace(r_start, r_minus + 0.0001, steps)
-        tau = np.linspace(0, M, steps)
-        
-        g_factor = kerr_blueshift_factor(r, 1.0, a)
-        
-        g_factor = np.nan_to_num(g_factor, nan=1.0)
-        
-        Temperature = T_SPACE * np.sqrt(g_factor) * 100 
-        
-        B_tau = B0 * g_factor
-        SNR_tau = SNR0 * g_factor
-        C_in = B_tau * np.log2(1 + SNR_tau)
-        
-        crash_mask = Temperature > T_MELT
-        
-        if np.any(crash_mask):
-            crash_idx = np.argmax(crash_mask)
-        else:
-            crash_idx = steps - 1
-            
-        if crash_idx == 0:
-            crash_idx = 1
-            
-        valid_tau = tau[:crash_idx]
-        valid_Cin = C_in[:crash_idx]
-        
-        throughput = np.minimum(valid_Cin, C_LIMIT)
-        
-        # Integral Ali
-        if len(valid_tau) > 1:
-            I_Ali = simpson(throughput, x=valid_tau)
-        else:
-            I_Ali = 0.0
-            
-        last_val = valid_tau[-1] if len(valid_tau) > 0 else 0.0
-
-        results[name] = {
-            "I_Ali": I_Ali,
-            "tau": valid_tau,
-            "Cin": valid_Cin,
-            "limit": C_LIMIT,
-            "crash_val": last_val,
-            "temp": Temperature[:crash_idx]
-        }
+        results[name] = simulate_hole(params["M"], params["a"], steps=SIMULATION_STEPS)
         
     return results
\ No newline at end of file
@@ -0,0 +1,212 @@
+"""
+Incremental build of the project artifacts.
+
+The build is a declared graph of stages. Each stage has a fingerprint:
+a SHA-256 of the sources it runs, the model constants behind it and the
+fingerprints of the stages it depends on. Fingerprints of finished stages
+are kept in output/.build/manifest.json, and a stage whose fingerprint is
+unchanged and whose outputs all exist is skipped. Stages without output
+files (font, simulate) only provide values; they run when something
+downstream has to run, and simulate is backed by the result cache.
+
+Stages whose dependencies are done run together as a wave, on a process
+pool when processes > 1 (matplotlib state is per process, so no threads).
+If a stage fails, the stages that finished are still recorded in the
+manifest before the error is raised.
+"""
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from . import cache
+from .profiling import pool_as_completed, span
+
+MANIFEST = "output/.build/manifest.json"
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class Stage:
+    def __init__(self, name, func, deps=(), sources=(), outputs=()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.sources = tuple(sources)
+        self.outputs = tuple(outputs)
+
+    @property
+    def produces_files(self):
+        return bool(self.outputs)
+
+    def up_to_date(self, fingerprint, manifest):
+        return (self.produces_files and manifest.get(self.name) == fingerprint
+                and all(os.path.exists(p) for p in self.outputs))
+
+# --- Stage functions (module level so worker processes can run them) ---
+
+def _stage_font():
+    from .utils import download_font
+    font_path = download_font()
+    if not font_path:
+        raise RuntimeError("Font download failed")
+    return font_path
+
+def _stage_simulate():
+    cache.configure(disk_dir=cache.CACHE_DIR)
+    return cache.run_simulation()
+
+def _stage_plots(simulate):
+    from .plotting import generate_plots
+    generate_plots(simulate)
+
+def _stage_infall():
+    from .visualizer import create_animation
+    create_animation()
+
+def _stage_perturbation():
+    from .visualizer_eht import generate_eht_animation
+    generate_eht_animation()
+
+def impact_factor(results):
+    """Normalized I_Ali used to perturb the shadow (TON 618 vs Stellar BH)."""
+    ifi_ton = results["TON 618"]["I_Ali"]
+    ifi_stellar = results["Stellar BH"]["I_Ali"]
+    if ifi_stellar > 0:
+        return math.log10(ifi_ton / ifi_stellar) / 10.0
+    return 0.5
+
+def _stage_shadow(simulate):
+    from .eht_imaging import generate_shadow_image
+    generate_shadow_image(impact_factor(simulate))
+
+def _stage_pdf(font):
+    from .pdf_generator import build_pdf
+    build_pdf(font)
+
+def _src(*names):
+    return tuple(os.path.join(PACKAGE_DIR, n) for n in names)
+
+STAGES = [
+    Stage("font", _stage_font),
+    Stage("simulate", _stage_simulate, sources=_src("physics.py", "kerr_metric.py", "config.py")),
+    Stage("plots", _stage_plots, deps=["simulate"],
+          sources=_src("plotting.py", "information.py"),
+          outputs=[f"output/{n}.png" for n in ("fig1_capacity", "fig2_scaling", "fig3_thermal",
+                                                "fig4_cumulative", "eq_temp", "eq_snr", "eq_lloyd")]),
+    Stage("infall", _stage_infall,
+          sources=_src("visualizer.py", "writers.py", "utils.py", "config.py"),
+          outputs=["output/Vision_Theory_Simulation.gif"]),
+    Stage("perturbation", _stage_perturbation,
+          sources=_src("visualizer_eht.py", "writers.py", "utils.py", "config.py"),
+          outputs=["output/The_Perturbation_A.gif", "output/fig3_perturbation.png"]),
+    Stage("shadow", _stage_shadow, deps=["simulate"],
+          sources=_src("eht_imaging.py", "writers.py", "utils.py", "config.py"),
+          outputs=["output/fig3_eht_shadow.png"]),
+    Stage("pdf", _stage_pdf, deps=["font", "plots", "perturbation", "shadow"],
+          sources=_src("pdf_generator.py", "config.py"),
+          outputs=["output/Vision_Theory_Ali_V11.pdf"]),
+]
+
+def fingerprints(stages=STAGES):
+    """{stage name: fingerprint} in declaration (topological) order."""
+    out = {}
+    for stage in stages:
+        h = hashlib.sha256(stage.name.encode())
+        for path in stage.sources:
+            with open(path, "rb") as f:
+                h.update(hashlib.sha256(f.read()).digest())
+        if stage.name == "simulate":
+            h.update(cache.cache_key("run_simulation").encode())
+        for dep in stage.deps:
+            h.update(out[dep].encode())
+        out[stage.name] = h.hexdigest()
+    return out
+
+def load_manifest(path=MANIFEST):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_manifest(manifest, path=MANIFEST):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+def plan(stages=STAGES, manifest=None, force=False):
+    """
+    Names of the stages that must run: stale file-producing stages plus,
+    transitively, the value stages they depend on.
+    """
+    manifest = load_manifest() if manifest is None else manifest
+    prints = fingerprints(stages)
+    by_name = {s.name: s for s in stages}
+
+    # Staleness propagates through fingerprints, so a direct check suffices
+    needed = {s.name for s in stages
+              if s.produces_files and (force or not s.up_to_date(prints[s.name], manifest))}
+    pending = list(needed)
+    while pending:
+        for dep in by_name[pending.pop()].deps:
+            if dep not in needed and not by_name[dep].produces_files:
+                needed.add(dep)
+                pending.append(dep)
+    return [s.name for s in stages if s.name in needed]
+
+def _run_stage(args):
+    name, func, kwargs = args
+    with span(f"stage:{name}", cat="build"):
+        return func(**kwargs)
+
+def build(processes=1, force=False, stages=STAGES, manifest_path=MANIFEST):
+    """
+    Run every stale stage. processes > 1 (or None for all cores) runs the
+    independent stages of a wave concurrently. Returns the names run.
+    """
+    manifest = load_manifest(manifest_path)
+    prints = fingerprints(stages)
+    todo = plan(stages, manifest, force)
+    by_name = {s.name: s for s in stages}
+
+    for s in stages:
+        if s.produces_files and s.name not in todo:
+            print(f"[INFO] Stage '{s.name}' up to date, skipped.")
+
+    processes = processes or os.cpu_count() or 1
+    values = {}
+    done = {s.name for s in stages if s.name not in todo}
+    remaining = list(todo)
+
+    def finish(name, value):
+        values[name] = value
+        done.add(name)
+        remaining.remove(name)
+        if by_name[name].produces_files:
+            manifest[name] = prints[name]
+
+    while remaining:
+        wave = [n for n in remaining if all(d in done for d in by_name[n].deps)]
+        tasks = [(n, by_name[n].func, {d: values[d] for d in by_name[n].deps if not by_name[d].produces_files})
+                 for n in wave]
+
+        failure = None
+        try:
+            if processes == 1 or len(wave) == 1:
+                for task in tasks:
+                    finish(task[0], _run_stage(task))
+            else:
+                with ProcessPoolExecutor(max_workers=min(processes, len(wave))) as pool:
+                    # Siblings of a failed stage still finish and are recorded
+                    for (name, _, _), value, error in pool_as_completed(pool, _run_stage, tasks):
+                        if error is None:
+                            finish(name, value)
+                        elif failure is None:
+                            failure = error
+        finally:
+            save_manifest(manifest, manifest_path)
+        if failure is not None:
+            raise failure
+
+    return todo
@@ -1,92 +1,257 @@
+"""
+Report figures for run_simulation-style result sets.
+
+generate_plots writes the standard figures for one result set. The per-
+result charts (capacity, thermal, cumulative) are drawn by PlotTemplates,
+which builds each figure once and only swaps line data between result
+sets; plot_batch uses one PlotTemplates for any number of sets (e.g. one
+per sweep point) at thumbnail dpi. Long series are decimated with LTTB
+(largest-triangle-three-buckets) before drawing, which keeps peaks, kinks
+and the crash edge of the curves.
+"""
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import os
 import numpy as np
+from . import physics
+from .information import InformationIndex
+from .profiling import span, traced
 
 OUTPUT_DIR = "output"
+MAX_POINTS = 1000       # Samples drawn per series after LTTB decimation
+THUMB_DPI = 100         # Default dpi of plot_batch figures
+STYLES = ['k:', 'k--', 'k-']
+EQUATIONS = {           # Equation images of the report: filename -> LaTeX
+    "eq_temp.png": r"$T_{probe} \approx 2.7K \cdot \sqrt{g(\tau)}$",
+    "eq_snr.png": r"$C(\tau) = B_0\,g(\tau) \cdot \log_2\left(1 + SNR_0\,g(\tau)\right)$",
+    "eq_lloyd.png": r"$C_{limit} = \frac{2E}{\pi\hbar} \approx 10^{17}\ \mathrm{bits/s}$",
+}
+
+def lttb_indices(x, y, n_out=MAX_POINTS):
+    """
+    Indices of the n_out points chosen by largest-triangle-three-buckets.
+    First and last samples are always kept; series with at most n_out
+    samples are returned whole.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets over the interior samples [1, n - 1); the last
+    # point is the "next bucket" of the final one
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    counts = np.diff(np.append(edges, n))
+    avg_x = np.add.reduceat(x, edges) / counts
+    avg_y = np.add.reduceat(y, edges) / counts
+
+    out = np.empty(n_out, dtype=np.intp)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        xa, ya = x[a], y[a]
+        # Twice the area of the triangle (previous pick, candidate, next-bucket mean)
+        area = np.abs((xa - avg_x[i + 1]) * (y[lo:hi] - ya) - (xa - x[lo:hi]) * (avg_y[i + 1] - ya))
+        a = lo + area.argmax()
+        out[i + 1] = a
+    return out
+
+def decimate(x, y, n_out=MAX_POINTS, log=False):
+    """LTTB-decimated (x, y); log=True picks points in log10(y) (log axes)."""
+    y = np.asarray(y)
+    idx = lttb_indices(x, np.log10(y) if log else y, n_out)
+    return np.asarray(x)[idx], y[idx]
+
+def hole_label(name):
+    a = physics.HOLES.get(name, {}).get("a")
+    return f'{name} (a={a})' if a is not None else name
+
+class PlotTemplates:
+    """
+    Persistent figures for Fig 1-4. Each save updates the existing line
+    artists (adding lines when a result set has more entries than any
+    before) and re-renders the same canvas; the bar chart is redrawn on
+    its persistent axes.
+    """
+    def __init__(self, dpi=300, max_points=MAX_POINTS):
+        self.dpi = dpi
+        self.max_points = max_points
+        self._laid_out = set()
+        with plt.style.context('grayscale'):
+            self._build_capacity()
+            self.bar_fig, self.bar_ax = self._figure()
+            self._build_thermal()
+            self._build_cumulative()
+
+    @staticmethod
+    def _figure():
+        fig = Figure(figsize=(8, 4.5))
+        FigureCanvasAgg(fig)
+        return fig, fig.add_subplot()
+
+    def _build_capacity(self):
+        self.cap_fig, ax = self._figure()
+        self.cap_ax = ax
+        self.cap_line, = ax.plot([], [], 'k-', lw=1.5, label=r'Input Capacity $C_{in}(\tau)$')
+        self.cap_limit = ax.axhline(1.0, color='red', linestyle='--', lw=1.5, label=r'Lloyd Limit ($C_{limit}$)')
+        self.cap_fill = None
+        ax.set_yscale('log')
+        ax.set_xlabel('Proper Time (Normalized)')
+        ax.set_ylabel('Bitrate (bits/s)')
+
+    def _build_thermal(self):
+        self.th_fig, ax = self._figure()
+        self.th_ax = ax
+        self.th_lines = []
+        self.th_melt = ax.axhline(1.0, color='red', ls='--')
+        ax.set_yscale('log')
+        ax.set_title(r'Fig 3: Probe Heating (Thermal Crash Analysis)')
+        ax.set_xlabel('Journey Progress (0% to Crash)')
+        ax.set_ylabel('Probe Temperature (K)')
+        ax.grid(True, which="both", ls="--", alpha=0.2)
+
+    def _build_cumulative(self):
+        self.cum_fig, ax = self._figure()
+        self.cum_ax = ax
+        self.cum_lines = []
+        ax.set_title(r'Fig 4: Cumulative Decoded Information')
+        ax.set_xlabel('Journey Progress (0% to Crash)')
+        ax.set_ylabel(r'Fraction of $I_{Ali}$ Received')
+        ax.grid(True, ls="--", alpha=0.2)
+
+    @staticmethod
+    def _lines(ax, pool, count):
+        """Reuse pooled Line2D artists, creating or hiding as needed."""
+        with plt.style.context('grayscale'):
+            while len(pool) < count:
+                style = STYLES[len(pool) % len(STYLES)]
+                pool.append(ax.plot([], [], style, lw=1.5)[0])
+        for i, line in enumerate(pool):
+            line.set_visible(i < count)
+        return pool[:count]
+
+    def _save(self, fig, ax, path, legend_loc='best'):
+        ax.relim(visible_only=True)
+        ax.autoscale_view()
+        ax.legend(loc=legend_loc)
+        # Margins from the first result set are kept (tight_layout is a full draw)
+        if fig not in self._laid_out:
+            fig.tight_layout()
+            self._laid_out.add(fig)
+        with span("savefig", path=path):
+            fig.savefig(path, dpi=self.dpi)
+
+    def capacity(self, name, data, path):
+        """Fig 1: C_in against the Lloyd limit for one result."""
+        tau, cin = decimate(data["tau"], data["Cin"], self.max_points, log=True)
+        self.cap_line.set_data(tau, cin)
+        self.cap_limit.set_ydata([data["limit"], data["limit"]])
+
+        # Processed information: area under min(C_in, C_limit)
+        if self.cap_fill is not None:
+            self.cap_fill.remove()
+        self.cap_fill = self.cap_ax.fill_between(tau, np.minimum(cin, data["limit"]), 0, color='gray',
+                                                 alpha=0.3, label='Processed Information (OFI)')
+        self.cap_ax.set_title(f'Fig 1: Information Horizon ({name})')
+        self._save(self.cap_fig, self.cap_ax, path, legend_loc='upper left')
 
-def generate_plots(results):
+    def scaling(self, results, path):
+        """Fig 2: I_Ali of every result relative to the first."""
+        names = list(results.keys())
+        ofis = [results[n]["I_Ali"] for n in names]
+        base_ofi = ofis[0] if ofis[0] > 0 else 1.0
+        norm_ofis = [x/base_ofi for x in ofis]
+
+        ax = self.bar_ax
+        ax.cla()
+        with plt.style.context('grayscale'):
+            bars = ax.bar(names, norm_ofis, color='#444444', edgecolor='black')
+
+            ax.set_yscale('log')
+            ax.set_ylabel(r'Relative OFI ($I_{Ali}$)')
+            ax.set_title('Fig 2: Scaling of Observable Information')
+
+            for bar, val in zip(bars, norm_ofis):
+                height = bar.get_height()
+                ax.text(bar.get_x() + bar.get_width()/2, height*1.1, f'x{val:.1e}', ha='center', fontsize=10)
+
+        if self.bar_fig not in self._laid_out:
+            self.bar_fig.tight_layout()
+            self._laid_out.add(self.bar_fig)
+        with span("savefig", path=path):
+            self.bar_fig.savefig(path, dpi=self.dpi)
+
+    def thermal(self, results, path, t_melt=None):
+        """Fig 3: probe temperature over normalized journey progress."""
+        t_melt = physics.T_MELT if t_melt is None else t_melt
+        names = list(results)
+        for line, n in zip(self._lines(self.th_ax, self.th_lines, len(names)), names):
+            temp = results[n]["temp"]
+            line.set_data(*decimate(np.linspace(0, 1, len(temp)), temp, self.max_points, log=True))
+            line.set_label(hole_label(n))
+        self.th_melt.set_ydata([t_melt, t_melt])
+        self.th_melt.set_label(f'Melting Point ({t_melt:.0f} K)')
+        self._save(self.th_fig, self.th_ax, path)
+
+    def cumulative(self, results, path):
+        """Fig 4: fraction of I_Ali received over journey progress."""
+        indices = {n: InformationIndex.from_result(results[n]) for n in results}
+        names = [n for n in indices if indices[n].total_bits > 0]
+        for line, n in zip(self._lines(self.cum_ax, self.cum_lines, len(names)), names):
+            index = indices[n]
+            progress = np.linspace(0, 1, len(index.tau))
+            line.set_data(*decimate(progress, index.cumulative / index.total_bits, self.max_points))
+            line.set_label(f'{n} ({index.total_bits:.1e} bits)')
+        self._save(self.cum_fig, self.cum_ax, path, legend_loc='upper left')
+
+def _plot_set(results, output_dir, templates, primary=None):
+    primary = primary or ("TON 618" if "TON 618" in results else next(iter(results)))
+    templates.capacity(primary, results[primary], f"{output_dir}/fig1_capacity.png")
+    templates.scaling(results, f"{output_dir}/fig2_scaling.png")
+    templates.thermal(results, f"{output_dir}/fig3_thermal.png")
+
+    # Cumulative information (precomputed by simulate_hole, no extra numerics)
+    if all("cumulative" in r for r in results.values()):
+        templates.cumulative(results, f"{output_dir}/fig4_cumulative.png")
+
+@traced()
+def generate_plots(results, output_dir=OUTPUT_DIR, primary=None, templates=None):
+    """
+    Standard figures for one result set ({name: simulate_hole result}).
+    primary selects the Fig 1 result (default "TON 618" if present, else
+    the first entry); every entry is drawn in the comparison figures.
+    """
     print("[INFO] Generating Plots (V12 Thermodynamics)...")
-    
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
-
-    data = results["TON 618"]
-    
-    plt.style.use('grayscale')
-    fig, ax = plt.subplots(figsize=(8, 4.5))
-    
-    ax.plot(data["tau"], data["Cin"], 'k-', lw=1.5, label=r'Input Capacity $C_{in}(\tau)$')
-    ax.axhline(data["limit"], color='red', linestyle='--', lw=1.5, label=r'Lloyd Limit ($C_{limit}$)')
-    
-    ax.fill_between(data["tau"], data["limit"], 0, where=(data["Cin"] > data["limit"]), 
-                    color='gray', alpha=0.3, label='Processed Information (OFI)')
-    ax.fill_between(data["tau"], data["Cin"], 0, where=(data["Cin"] <= data["limit"]), 
-                    color='gray', alpha=0.3)
-    
-    ax.set_yscale('log')
-    ax.set_title(r'Fig 1: Information Horizon (TON 618)')
-    ax.set_xlabel('Proper Time (Normalized)')
-    ax.set_ylabel('Bitrate (bits/s)')
-    ax.legend(loc='upper left')
-    
-    plt.tight_layout()
-    plt.savefig(f"{OUTPUT_DIR}/fig1_capacity.png", dpi=300)
-    plt.close()
 
-    names = list(results.keys())
-    ofis = [results[n]["I_Ali"] for n in names]
-    base_ofi = ofis[0] if ofis[0] > 0 else 1.0
-    norm_ofis = [x/base_ofi for x in ofis]
-    
-    fig, ax = plt.subplots(figsize=(8, 4.5))
-    bars = ax.bar(names, norm_ofis, color='#444444', edgecolor='black')
-    
-    ax.set_yscale('log')
-    ax.set_ylabel(r'Relative OFI ($I_{Ali}$)')
-    ax.set_title('Fig 2: Scaling of Observable Information')
-    
-    for bar, val in zip(bars, norm_ofis):
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2, height*1.1, f'x{val:.1e}', ha='center', fontsize=10)
-        
-    plt.tight_layout()
-    plt.savefig(f"{OUTPUT_DIR}/fig2_scaling.png", dpi=300)
-    plt.close()
-    
-    fig, ax = plt.subplots(figsize=(8, 4.5))
-    
-    # TON 618
-    t_ton = results["TON 618"]["tau"]
-    temp_ton = results["TON 618"]["temp"]
-    t_ton_norm = np.linspace(0, 1, len(t_ton))
-    
-    # Stellar
-    t_st = results["Stellar BH"]["tau"]
-    temp_st = results["Stellar BH"]["temp"]
-    t_st_norm = np.linspace(0, 1, len(t_st))
-    
-    ax.plot(t_ton_norm, temp_ton, 'k-', lw=2, label='TON 618 (a=0.99)')
-    ax.plot(t_st_norm, temp_st, 'k:', lw=1.5, label='Stellar BH (a=0.0)')
-    
-    T_MELT = 3500.0
-    ax.axhline(T_MELT, color='red', ls='--', label='Melting Point (3500 K)')
-    
-    ax.set_yscale('log')
-    ax.set_title(r'Fig 3: Probe Heating (Thermal Crash Analysis)')
-    ax.set_xlabel('Journey Progress (0% to Crash)')
-    ax.set_ylabel('Probe Temperature (K)')
-    ax.legend()
-    ax.grid(True, which="both", ls="--", alpha=0.2)
-    
-    plt.tight_layout()
-    plt.savefig(f"{OUTPUT_DIR}/fig3_thermal.png", dpi=300)
-    plt.close()
-    
-    _render_eq(r"$T_{probe} \approx 2.7K \cdot \sqrt{g(\tau)}$", "eq_temp.png")
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
 
-def _render_eq(latex, filename):
+    _plot_set(results, output_dir, templates or PlotTemplates(), primary)
+    for filename, latex in EQUATIONS.items():
+        _render_eq(latex, filename, output_dir)
+
+@traced()
+def plot_batch(result_sets, output_dir="output/plots", dpi=THUMB_DPI, primary=None):
+    """
+    generate_plots for many result sets ({label: results}) with one set of
+    figure templates; set `label` is written to output_dir/label/.
+    """
+    print(f"[INFO] Plotting {len(result_sets)} result sets...")
+    templates = PlotTemplates(dpi=dpi)
+    for label, results in result_sets.items():
+        set_dir = f"{output_dir}/{label}"
+        if not os.path.exists(set_dir):
+            os.makedirs(set_dir)
+        _plot_set(results, set_dir, templates, primary)
+    print(f"[SUCCESS] Batch plots saved: {output_dir}")
+
+def _render_eq(latex, filename, output_dir=OUTPUT_DIR):
     plt.figure(figsize=(6, 1.5))
     plt.text(0.5, 0.5, latex, ha='center', fontsize=18)
     plt.axis('off')
-    plt.savefig(f"{OUTPUT_DIR}/{filename}", dpi=300, bbox_inches='tight')
-    plt.close()
\ No newline at end of file
+    with span("savefig", path=f"{output_dir}/{filename}"):
+        plt.savefig(f"{output_dir}/{filename}", dpi=300, bbox_inches='tight')
+    plt.close()
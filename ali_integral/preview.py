@@ -0,0 +1,53 @@
+"""
+Progressive level-of-detail previews.
+
+A PreviewSession renders the infall animation, the Perturbation.A
+animation and the EHT shadow figure at a coarse level of detail (lod: the
+divisor applied to resolution, dpi and frame count) and refines to full
+quality on request. Between levels only the full-resolution starfield is
+reused (previews use its block-max downsample, so the refined render shows
+the same sky); every other result is recomputed at the new resolution.
+ShadowField grids are cached per resolution, so they only help repeated
+renders at the same level (e.g. a new I_Ali). Per-run frame state
+(lensing maps, the Perturbation.A figure) is released after every render.
+"""
+import time
+
+from . import config
+from .eht_imaging import generate_shadow_image
+from .visualizer import create_animation
+from .visualizer_eht import generate_eht_animation
+
+TARGETS = ("infall", "perturbation", "shadow")
+
+class PreviewSession:
+    def __init__(self, lod=None, processes=1):
+        self.lod = config.PREVIEW_LOD if lod is None else lod
+        self.processes = processes
+        self.timings = {}
+
+    def render(self, I_Ali_normalized=0.5, targets=TARGETS):
+        """Render targets at the current level. Returns {target: path}."""
+        renderers = {
+            "infall": lambda: create_animation(processes=self.processes, lod=self.lod),
+            "perturbation": lambda: generate_eht_animation(processes=self.processes, lod=self.lod),
+            "shadow": lambda: generate_shadow_image(I_Ali_normalized, lod=self.lod),
+        }
+        paths = {}
+        for target in targets:
+            if target not in renderers:
+                raise ValueError(f"Unknown preview target '{target}'. Available: {list(TARGETS)}")
+            start = time.perf_counter()
+            paths[target] = renderers[target]()
+            self.timings[(target, self.lod)] = time.perf_counter() - start
+        return paths
+
+    def refine(self, I_Ali_normalized=0.5, targets=TARGETS):
+        """Halve lod (down to full quality, lod=1) and render again."""
+        self.lod = max(self.lod // 2, 1)
+        return self.render(I_Ali_normalized, targets)
+
+    def finalize(self, I_Ali_normalized=0.5, targets=TARGETS):
+        """Jump straight to full quality (the regular output files)."""
+        self.lod = 1
+        return self.render(I_Ali_normalized, targets)
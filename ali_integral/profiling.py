@@ -0,0 +1,232 @@
+"""
+Opt-in instrumentation: wall time, CPU time, call count and peak
+allocation per named span, exported as a Chrome / Perfetto trace
+(chrome://tracing, ui.perfetto.dev) and as a summary table.
+
+    from ali_integral import profiling
+    profiling.enable(memory=True)
+    build()
+    profiling.write_trace("output/trace.json")
+    print(profiling.summary())
+
+Setting ALI_PROFILE=trace.json does the same for a whole run (the trace
+is written and the table printed to stderr at exit); ALI_PROFILE_MEMORY=1
+adds tracemalloc peaks, which slows the run down noticeably.
+
+Code is instrumented with `with span(name):` and `@traced(name)`. While
+profiling is disabled span() returns one shared no-op context manager and
+a traced function costs one flag check, so the hooks stay in place in
+production runs. Spans opened in pool workers (pool_map) are sent back
+with the task results and show up under the worker's pid.
+"""
+import atexit
+import contextlib
+import functools
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import as_completed
+
+ENV_TRACE = "ALI_PROFILE"
+ENV_MEMORY = "ALI_PROFILE_MEMORY"
+
+_enabled = False
+_memory = False
+_events = []            # Chrome trace "complete" events, in end order
+_local = threading.local()
+_NULL = contextlib.nullcontext()
+
+def enabled():
+    return _enabled
+
+def enable(memory=False):
+    """Start recording spans; memory=True also records tracemalloc peaks."""
+    global _enabled, _memory
+    _enabled = True
+    _memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def disable():
+    """Stop recording (recorded events are kept until reset())."""
+    global _enabled, _memory
+    _enabled = False
+    if _memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _memory = False
+
+def reset():
+    _events.clear()
+
+def events():
+    return list(_events)
+
+def _memory_stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "_t0", "_c0")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        if _memory:
+            current, peak = tracemalloc.get_traced_memory()
+            stack = _memory_stack()
+            if stack:
+                # The parent's peak so far survives the reset below
+                stack[-1][1] = max(stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            stack.append([current, current])
+        self._c0 = time.process_time_ns()
+        self._t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        t1 = time.perf_counter_ns()
+        c1 = time.process_time_ns()
+        args = dict(self.args)
+        args["cpu_ms"] = (c1 - self._c0) / 1e6
+        if _memory and tracemalloc.is_tracing():
+            stack = _memory_stack()
+            start, seen = stack.pop()
+            peak = max(tracemalloc.get_traced_memory()[1], seen)
+            args["peak_bytes"] = peak - start
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+        _events.append({
+            "name": self.name, "cat": self.cat, "ph": "X",
+            "ts": self._t0 / 1e3, "dur": (t1 - self._t0) / 1e3,
+            "pid": os.getpid(), "tid": threading.get_ident(), "args": args,
+        })
+        return False
+
+def span(name, cat="ali", **args):
+    """Context manager timing the enclosed block (no-op while disabled)."""
+    if not _enabled:
+        return _NULL
+    return _Span(name, cat, args)
+
+def traced(name=None, cat="ali"):
+    """Decorator: every call of the function is a span (default name module.qualname)."""
+    def decorate(func):
+        label = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(label, cat, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# --- Worker processes ---
+
+class _Remote:
+    """func for a pool worker: returns (result, spans recorded during the call)."""
+    def __init__(self, func, memory):
+        self.func = func
+        self.memory = memory
+
+    def __call__(self, item):
+        if not _enabled:
+            enable(self.memory)
+        start = len(_events)    # Forked workers inherit the parent's events
+        result = self.func(item)
+        recorded = _events[start:]
+        del _events[start:]
+        return result, recorded
+
+def pool_map(pool, func, items, chunksize=1):
+    """pool.map that also collects the spans recorded in the workers while enabled."""
+    if not _enabled:
+        yield from pool.map(func, items, chunksize=chunksize)
+        return
+    for result, recorded in pool.map(_Remote(func, _memory), items, chunksize=chunksize):
+        _events.extend(recorded)
+        yield result
+
+def pool_as_completed(pool, func, items):
+    """
+    Submit func(item) for every item to a concurrent.futures pool and yield
+    (item, result, error) as the tasks finish; error is the exception a
+    task raised (result None), so one failure does not hide the others.
+    Worker spans are collected as in pool_map.
+    """
+    remote = _Remote(func, _memory) if _enabled else func
+    futures = {pool.submit(remote, item): item for item in items}
+    for future in as_completed(futures):
+        try:
+            result = future.result()
+        except Exception as e:
+            yield futures[future], None, e
+            continue
+        if remote is not func:
+            result, recorded = result
+            _events.extend(recorded)
+        yield futures[future], result, None
+
+# --- Export ---
+
+def summary_rows(evts=None):
+    """
+    Per span name: {"name", "calls", "wall_s", "cpu_s", "peak_bytes"}
+    (peak_bytes None without memory tracing), sorted by total wall time.
+    """
+    rows = {}
+    for e in _events if evts is None else evts:
+        row = rows.setdefault(e["name"], {"name": e["name"], "calls": 0, "wall_s": 0.0,
+                                          "cpu_s": 0.0, "peak_bytes": None})
+        row["calls"] += 1
+        row["wall_s"] += e["dur"] / 1e6
+        row["cpu_s"] += e["args"]["cpu_ms"] / 1e3
+        if "peak_bytes" in e["args"]:
+            row["peak_bytes"] = max(row["peak_bytes"] or 0, e["args"]["peak_bytes"])
+    return sorted(rows.values(), key=lambda r: r["wall_s"], reverse=True)
+
+def summary(evts=None):
+    """Plain-text table of summary_rows (nested spans are counted in their parents too)."""
+    lines = [f"{'span':<40} {'calls':>7} {'wall s':>10} {'cpu s':>10} {'peak MiB':>10}"]
+    for r in summary_rows(evts):
+        peak = "-" if r["peak_bytes"] is None else f"{r['peak_bytes'] / 2**20:.1f}"
+        lines.append(f"{r['name']:<40} {r['calls']:>7} {r['wall_s']:>10.3f} {r['cpu_s']:>10.3f} {peak:>10}")
+    return "\n".join(lines)
+
+def write_trace(path, evts=None):
+    """Write the spans as Chrome trace-event JSON (timestamps from the first span)."""
+    evts = _events if evts is None else evts
+    origin = min((e["ts"] for e in evts), default=0.0)
+    trace = [dict(e, ts=e["ts"] - origin) for e in evts]
+    trace += [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"ali_integral {pid}"}}
+              for pid in sorted({e["pid"] for e in evts})]
+
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, "w") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+    return path
+
+def report(path, stream=None):
+    """write_trace(path) and print the summary table (to stderr by default)."""
+    write_trace(path)
+    print(f"[INFO] Trace written: {path}\n{summary()}", file=stream or sys.stderr)
+
+def _report_at_exit(path):
+    if multiprocessing.parent_process() is None:   # Workers hand their spans to the parent
+        report(path)
+
+if os.environ.get(ENV_TRACE):
+    enable(memory=os.environ.get(ENV_MEMORY, "") not in ("", "0"))
+    atexit.register(_report_at_exit, os.environ[ENV_TRACE])
@@ -0,0 +1,98 @@
+"""
+Parameter sweeps over the run_simulation model.
+
+A sweep is the cartesian product of per-parameter grids, evaluated with
+physics.simulate_hole across a process pool in chunks and collected into
+one structured array (optionally written to .npy or .csv).
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import physics
+from .profiling import pool_map
+
+# Sweepable parameters, in table column order (simulate_hole keywords)
+SWEEP_PARAMS = ("M", "a", "b0", "snr0", "c_limit", "t_melt", "f_crit")
+
+SWEEP_DTYPE = np.dtype(
+    [(name, "f8") for name in SWEEP_PARAMS]
+    + [("I_Ali", "f8"), ("crash_val", "f8"), ("crash_idx", "i8")]
+)
+
+def _defaults():
+    # Resolved in the parent process so patched constants reach the workers
+    return {
+        "b0": physics.B0,
+        "snr0": physics.SNR0,
+        "c_limit": physics.C_LIMIT,
+        "t_melt": physics.T_MELT,
+        "f_crit": np.nan,  # NaN = structural crash disabled
+    }
+
+def grid_points(grid):
+    """
+    Cartesian product of a {param: values} grid as an (n, 7) float array.
+    "M" and "a" are required; other parameters missing from the grid take
+    their current default.
+    """
+    unknown = set(grid) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameter(s): {sorted(unknown)}. Available: {list(SWEEP_PARAMS)}")
+    if "M" not in grid or "a" not in grid:
+        raise ValueError("Sweep grid needs at least 'M' and 'a'")
+
+    defaults = _defaults()
+    axes = [np.atleast_1d(np.asarray(grid[name] if name in grid else defaults[name], dtype=float)) for name in SWEEP_PARAMS]
+
+    return np.array(list(itertools.product(*axes)), dtype=float).reshape(-1, len(SWEEP_PARAMS))
+
+def _run_chunk(args):
+    points, steps = args
+    out = np.zeros(len(points), dtype=SWEEP_DTYPE)
+
+    for i, row in enumerate(points):
+        kwargs = dict(zip(SWEEP_PARAMS, row))
+        f_crit = kwargs.pop("f_crit")
+        res = physics.simulate_hole(steps=steps, f_crit=None if np.isnan(f_crit) else f_crit, **kwargs)
+        out[i] = (*row, res["I_Ali"], res["crash_val"], len(res["tau"]))
+
+    return out
+
+def save_table(table, path):
+    """Write a sweep table as .npy (lossless) or .csv (with header)."""
+    if str(path).endswith(".csv"):
+        fmt = ["%.17g"] * (len(table.dtype.names) - 1) + ["%d"]
+        np.savetxt(path, table, delimiter=",", header=",".join(table.dtype.names), comments="", fmt=fmt)
+    else:
+        np.save(path, table)
+
+def run_sweep(grid, steps=None, processes=None, chunk_size=64, output=None):
+    """
+    Evaluate simulate_hole on every point of `grid`.
+
+    Points are split into chunks of `chunk_size` and fanned out over
+    `processes` workers (os.cpu_count() by default, 1 runs in-process).
+    Returns a structured array with one row per point, in grid order.
+    """
+    points = grid_points(grid)
+    chunks = [points[i:i + chunk_size] for i in range(0, len(points), chunk_size)]
+    tasks = [(chunk, steps) for chunk in chunks]
+
+    processes = processes or os.cpu_count() or 1
+
+    if processes == 1 or len(tasks) <= 1:
+        parts = [_run_chunk(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(processes, len(tasks))) as pool:
+            parts = list(pool_map(pool, _run_chunk, tasks))
+
+    table = np.concatenate(parts) if parts else np.zeros(0, dtype=SWEEP_DTYPE)
+
+    if output:
+        save_table(table, output)
+        print(f"[SUCCESS] Sweep table saved: {output} ({len(table)} points)")
+
+    return table
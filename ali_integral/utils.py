@@ -1,6 +1,41 @@
 import os
 import urllib.request
 import ssl
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from . import config
+from .profiling import pool_map
+
+def image_dtype(dtype=None):
+    """Float dtype for image buffers: explicit dtype or config.IMAGE_DTYPE."""
+    return np.dtype(config.IMAGE_DTYPE if dtype is None else dtype)
+
+def parallel_map(func, items, processes=1, initializer=None, initargs=(), chunksize=1):
+    """
+    Ordered, lazy map of func over items.
+
+    processes=1 runs in-process (after calling initializer once), so both
+    paths execute the same worker code. Otherwise items are spread over a
+    process pool whose initializer receives the invariant inputs once per
+    worker instead of once per task. processes=None uses every core.
+    """
+    processes = processes or os.cpu_count() or 1
+    items = list(items)
+
+    if processes == 1 or len(items) <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for item in items:
+            yield func(item)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(processes, len(items)),
+                             initializer=initializer, initargs=initargs) as pool:
+        yield from pool_map(pool, func, items, chunksize=chunksize)
+
+def output_root(lod=1):
+    """Output directory for a render: "output", or config.PREVIEW_DIR for previews (lod > 1)."""
+    return "output" if lod == 1 else config.PREVIEW_DIR
 
 def download_font(font_name="DejaVuSans.ttf"):
     """
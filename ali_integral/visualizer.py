@@ -1,20 +1,113 @@
 import numpy as np
-import imageio
 import os
+from contextlib import nullcontext
+from .profiling import traced
+from .utils import image_dtype, output_root, parallel_map
+from .writers import PngSequenceWriter, open_writer
 
-def generate_starfield(width, height, num_stars=2000):
+MAP_CACHE = 2           # Remap tables kept by LensingEngine (one per shadow radius)
+
+def generate_starfield(width, height, num_stars=2000, dtype=None):
     stars_x = np.random.randint(0, width, num_stars)
     stars_y = np.random.randint(0, height, num_stars)
     brightness = np.random.uniform(0.5, 1.0, num_stars)
     
-    universe = np.zeros((height, width, 3))
+    universe = np.zeros((height, width, 3), dtype=image_dtype(dtype))
     
-    for x, y, b in zip(stars_x, stars_y, brightness):
-        if 0 <= x < width and 0 <= y < height:
-            universe[y, x] = [b, b, b*0.9]
+    universe[stars_y, stars_x] = brightness[:, None] * [1.0, 1.0, 0.9]
             
     return universe
 
+STAR_TINT = np.array([1.0, 1.0, 0.9])   # [R, G, B] colour of a star of brightness b
+
+class StarCatalog:
+    """
+    Sparse sky: star positions and brightness in compact float32 arrays
+    instead of a dense (height, width, 3) image.
+    """
+    def __init__(self, x, y, brightness, width, height):
+        self.x = np.asarray(x, dtype=np.float32)
+        self.y = np.asarray(y, dtype=np.float32)
+        self.brightness = np.asarray(brightness, dtype=np.float32)
+        self.width, self.height = width, height
+
+    def __len__(self):
+        return len(self.x)
+
+    @classmethod
+    def random(cls, width, height, num_stars=2000, seed=None):
+        """Same distribution as generate_starfield, from a seeded RNG."""
+        rng = np.random.default_rng(seed)
+        return cls(rng.integers(0, width, num_stars), rng.integers(0, height, num_stars),
+                   rng.uniform(0.5, 1.0, num_stars), width, height)
+
+    def to_image(self, dtype=np.float64):
+        """Dense image equivalent (vectorized generate_starfield)."""
+        universe = np.zeros((self.height, self.width, 3), dtype=dtype)
+        universe[self.y.astype(np.intp), self.x.astype(np.intp)] = self.brightness[:, None] * STAR_TINT
+        return universe
+
+def splat_stars(x, y, brightness, width, height, out=None):
+    """Bilinear forward splat of point sources into a (height, width, 3) frame."""
+    if out is None:
+        out = np.zeros((height, width, 3))
+    else:
+        out[...] = 0
+
+    x0 = np.floor(x).astype(np.intp)
+    y0 = np.floor(y).astype(np.intp)
+    fx = x - x0
+    fy = y - y0
+
+    flat_idx = []
+    flat_w = []
+    for dx, dy, wgt in ((0, 0, (1 - fx) * (1 - fy)), (1, 0, fx * (1 - fy)),
+                        (0, 1, (1 - fx) * fy), (1, 1, fx * fy)):
+        xi, yi = x0 + dx, y0 + dy
+        ok = (xi >= 0) & (xi < width) & (yi >= 0) & (yi < height)
+        flat_idx.append(yi[ok] * width + xi[ok])
+        flat_w.append((brightness * wgt)[ok])
+
+    # Sum coincident hits, then touch only the lit pixels
+    pixels, inverse = np.unique(np.concatenate(flat_idx), return_inverse=True)
+    energy = np.bincount(inverse, np.concatenate(flat_w), minlength=len(pixels))
+    out.reshape(-1, 3)[pixels] += energy[:, None] * STAR_TINT
+    return out
+
+def lens_star_catalog(catalog, r_observer, out=None):
+    """
+    Forward-map only the stars through the apply_lensing model and splat
+    them, so cost scales with star count rather than pixel count.
+
+    Inverting src = c + d / (1 - R_s / rho) gives rho^2 - rho_s rho +
+    rho_s R_s = 0: for rho_s >= 4 R_s each star has a primary image and a
+    secondary one just outside the shadow. Unlike the dense inverse map,
+    the sky does not wrap around the frame edges.
+    """
+    w, h = catalog.width, catalog.height
+    cx, cy = w / 2, h / 2
+    shadow_radius = LensingEngine.shadow_radius(r_observer)
+
+    dx = catalog.x - cx
+    dy = catalog.y - cy
+    rho_s = np.sqrt(dx**2 + dy**2)
+    disc = rho_s**2 - 4.0 * rho_s * shadow_radius
+    seen = (disc >= 0) & (rho_s > 0)
+
+    root = np.sqrt(np.where(seen, disc, 0.0))
+    ux = np.where(seen, dx / np.where(rho_s > 0, rho_s, 1.0), 0.0)
+    uy = np.where(seen, dy / np.where(rho_s > 0, rho_s, 1.0), 0.0)
+
+    xs, ys, bs = [], [], []
+    for rho in (0.5 * (rho_s + root), 0.5 * (rho_s - root)):
+        ok = seen & (rho > shadow_radius)
+        xs.append(cx + ux[ok] * rho[ok])
+        ys.append(cy + uy[ok] * rho[ok])
+        bs.append(catalog.brightness[ok])
+
+    frame = splat_stars(np.concatenate(xs), np.concatenate(ys), np.concatenate(bs), w, h, out=out)
+    return frame, shadow_radius
+
 def apply_lensing(universe, r_observer, M=1.0):
     h, w, _ = universe.shape
     y_grid, x_grid = np.mgrid[0:h, 0:w]
@@ -47,69 +140,266 @@ def apply_lensing(universe, r_observer, M=1.0):
     
     return rendered_view, shadow_radius
 
-def apply_blueshift(image, r_observer, M=1.0):
+class LensingEngine:
+    """
+    Frame-invariant lensing geometry for one (height, width) view.
+
+    The pixel grid, offsets and radius are built once; each frame's remap
+    depends on r_observer only through shadow_radius. Only the last
+    max_cached maps are kept: a map costs several bytes per pixel (far more
+    in bilinear mode) and an animation never repeats a distance, so raise
+    it only when the same r_observer values are rendered again.
+    mode="nearest" reproduces apply_lensing exactly; mode="bilinear"
+    samples the four neighbouring source pixels with flat index / weight
+    arrays (antialiased). scale is the size of the view relative to the
+    full-resolution render (1 / lod for previews); the shadow radius is
+    given in full-resolution pixels and scaled with it.
+    """
+    def __init__(self, width, height, mode="nearest", max_cached=MAP_CACHE, scale=1.0):
+        if mode not in ("nearest", "bilinear"):
+            raise ValueError(f"Unknown lensing mode '{mode}'. Available: ['nearest', 'bilinear']")
+        self.width, self.height, self.mode = width, height, mode
+        self.max_cached = max_cached
+        self.scale = scale
+        self._maps = {}
+
+        y_grid, x_grid = np.mgrid[0:height, 0:width]
+        self.cx, self.cy = width / 2, height / 2
+        self.x_off = (x_grid - self.cx).ravel()
+        self.y_off = (y_grid - self.cy).ravel()
+        self.radius_px = np.sqrt(self.x_off**2 + self.y_off**2)
+        self._radius_eps = self.radius_px + 1e-5
+
+    @staticmethod
+    def shadow_radius(r_observer):
+        scale_factor = 500.0 / r_observer
+        return 2.6 * scale_factor
+
+    def _build_map(self, shadow_radius):
+        w, h = self.width, self.height
+
+        # --- EINSTEIN RING ---
+        distortion = 1.0 - (shadow_radius / self._radius_eps)
+        denom = distortion + 1e-5
+
+        src_x = (self.cx + self.x_off / denom) % w
+        src_y = (self.cy + self.y_off / denom) % h
+        shadow = np.flatnonzero(self.radius_px < shadow_radius)
+
+        if self.mode == "nearest":
+            index = src_y.astype(np.intp) * w + src_x.astype(np.intp)
+            return index, None, shadow
+
+        x0 = np.floor(src_x)
+        y0 = np.floor(src_y)
+        fx = (src_x - x0).astype(np.float32)
+        fy = (src_y - y0).astype(np.float32)
+        x0 = x0.astype(np.intp) % w
+        y0 = y0.astype(np.intp) % h
+        x1 = (x0 + 1) % w
+        y1 = (y0 + 1) % h
+
+        index = np.stack([y0 * w + x0, y0 * w + x1, y1 * w + x0, y1 * w + x1])
+        weight = np.stack([(1 - fx) * (1 - fy), fx * (1 - fy), (1 - fx) * fy, fx * fy])
+        return index, weight, shadow
+
+    def remap(self, r_observer):
+        shadow_radius = self.shadow_radius(r_observer) * self.scale
+        if shadow_radius not in self._maps:
+            if len(self._maps) >= self.max_cached:
+                self._maps.pop(next(iter(self._maps)))
+            self._maps[shadow_radius] = self._build_map(shadow_radius)
+        return self._maps[shadow_radius], shadow_radius
+
+    def render(self, universe, r_observer, out=None):
+        """Same contract as apply_lensing(universe, r_observer)."""
+        (index, weight, shadow), shadow_radius = self.remap(r_observer)
+        flat = universe.reshape(-1, universe.shape[-1])
+
+        if out is None:
+            out = np.empty_like(universe)
+        view = out.reshape(-1, universe.shape[-1])
+
+        if weight is None:
+            np.take(flat, index, axis=0, out=view)
+        else:
+            np.multiply(flat[index[0]], weight[0][:, None], out=view)
+            for k in range(1, 4):
+                view += flat[index[k]] * weight[k][:, None]
+
+        # Draw black hole
+        view[shadow] = 0
+        return out, shadow_radius
+
+def blueshift_intensity(r_observer, M=1.0):
     # g ~ 1 / sqrt(1 - 2M/r)
     if r_observer <= 2.1 * M:
-        intensity = 100.0
-    else:
-        intensity = 1.0 / np.sqrt(1.0 - 2.0*M/r_observer)
-    
-    bright_image = image * intensity
+        return 100.0
+    return 1.0 / np.sqrt(1.0 - 2.0*M/r_observer)
+
+def apply_blueshift(image, r_observer, M=1.0, out=None):
+    """
+    Brighten and blue-shift `image`. Runs as an in-place ufunc chain on
+    `out` (pass out=image to overwrite the input); no full-size temporaries.
+    """
+    intensity = blueshift_intensity(r_observer, M)
     
     # 2. Blue Sheet
-    # [R, G, B]
-    shift_vector = [1.0/intensity, 1.0, intensity] 
+    # [R, G, B], folded with the brightening into one per-channel scale
+    shift_vector = np.array([1.0/intensity, 1.0, intensity]) * intensity
     
-    final_image = bright_image * shift_vector
+    if out is None:
+        out = np.empty_like(image)
+    np.multiply(image, shift_vector.astype(out.dtype), out=out)
+    np.clip(out, 0, 1, out=out)
     
-    final_image = np.clip(final_image, 0, 1)
+    return out, intensity
+
+def to_uint8(image, out=None, scratch=None):
+    """(image * 255).astype(uint8) through preallocated buffers."""
+    if scratch is None:
+        scratch = np.empty_like(image)
+    if out is None:
+        out = np.empty(image.shape, dtype=np.uint8)
+    np.multiply(image, 255, out=scratch)
+    out[...] = scratch
+    return out
+
+def quantize(image):
+    """
+    Palette form of a non-negative image (done once per sky): the sorted
+    distinct values, 0 first, and the index of every pixel value in them.
+    A starfield has a few thousand distinct values, so this is exact.
+    """
+    values = np.union1d(np.zeros(1, dtype=image.dtype), image)
+    dtype = np.uint16 if values.size <= 2**16 else np.uint32
+    return np.searchsorted(values, image).astype(dtype), values
+
+def blueshift_lut(values, r_observer, M=1.0):
+    """
+    (len(values), 3) uint8 table: apply_blueshift + to_uint8 of every
+    palette value, with the same float operations, so lookups are exact.
+    """
+    intensity = blueshift_intensity(r_observer, M)
+    shift_vector = np.array([1.0/intensity, 1.0, intensity]) * intensity
+    table = values[:, None] * shift_vector.astype(values.dtype)
+    np.clip(table, 0, 1, out=table)
+    np.multiply(table, 255, out=table)
+    return table.astype(np.uint8), intensity
+
+def apply_blueshift_lut(indices, values, r_observer, M=1.0, out=None):
+    """
+    uint8 frame straight from quantize() indices: one table lookup per
+    channel replaces multiply, clip and the uint8 conversion.
+    """
+    lut, intensity = blueshift_lut(values, r_observer, M)
+    if out is None:
+        out = np.empty(indices.shape, dtype=np.uint8)
+    for c in range(indices.shape[-1]):
+        np.take(lut[:, c], indices[..., c], out=out[..., c])
+    return out, intensity
+
+_FRAME_STATE = {}
+
+def _init_frame_worker(universe, scale=1.0):
+    # Invariant inputs: shipped once per worker, buffers reused per frame.
+    # The sky is quantized once; nearest lensing only moves pixels, so it
+    # runs on the palette indices (the shadow is index 0, black)
+    indices, values = quantize(universe)
+    _FRAME_STATE["indices"] = indices
+    _FRAME_STATE["values"] = values
+    _FRAME_STATE["lensing"] = LensingEngine(universe.shape[1], universe.shape[0], scale=scale)
+    _FRAME_STATE["view"] = np.empty_like(indices)
+
+@traced("visualizer.frame")
+def render_frame(r):
+    """
+    One animation frame at distance r (needs _init_frame_worker); equal to
+    to_uint8(apply_blueshift(LensingEngine.render(universe, r))).
+    """
+    st = _FRAME_STATE
+    view, shadow_r = st["lensing"].render(st["indices"], r, out=st["view"])
     
-    return final_image, intensity
+    # 2. Energy (Vision), straight into uint8 for photos
+    return apply_blueshift_lut(view, st["values"], r)
+
+_SKY = {}
+
+def sky(width, height):
+    """
+    Full-resolution starfield, generated once per size so previews and the
+    refined render show the same stars.
+    """
+    if (width, height) not in _SKY:
+        _SKY[(width, height)] = generate_starfield(width, height)
+    return _SKY[(width, height)]
+
+def downsample(image, factor):
+    """Block-max downsample by an integer factor (keeps single-pixel stars)."""
+    if factor == 1:
+        return image
+    h, w = image.shape[0] // factor, image.shape[1] // factor
+    blocks = image[:h * factor, :w * factor].reshape(h, factor, w, factor, -1)
+    return blocks.max(axis=(1, 3))
 
-def create_animation():
+@traced()
+def create_animation(processes=1, output=None, palette="adaptive", delta=False, lod=1):
+    """
+    Render the infall animation. processes > 1 (or None for all cores)
+    renders frames on a process pool; frames are identical to the
+    sequential path and reassembled in order.
+
+    Frames stream straight into the PNG sequence and the animation file
+    (.gif, or .mp4 / .webm with imageio-ffmpeg), so memory does not grow
+    with the frame count. palette / delta select the GIF mode (see writers).
+
+    lod > 1 is a preview: resolution and frame count divided by lod, no
+    PNG sequence, output under config.PREVIEW_DIR. The starfield is the
+    block-max downsample of the full-resolution one and the lensing
+    geometry is scaled by 1 / lod, so a preview is a coarse final render.
+    """
     print("[INFO] Rendering 'Eyes of the Doomed' Simulation...")
-    output_dir = "output/animation"
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    root = output_root(lod)
+    output = output or f"{root}/Vision_Theory_Simulation.gif"
+    output_dir = f"{root}/animation"   # PNG sequence, full quality only
+    movie_dir = os.path.dirname(output)
+    if movie_dir and not os.path.exists(movie_dir):
+        os.makedirs(movie_dir)
         
     width, height = 640, 360
-    universe = generate_starfield(width, height)
-    
-    frames = []
+    universe = downsample(sky(width, height), lod)
+    height, width = universe.shape[:2]
     
-    distances = np.linspace(15, 2.05, 60) # 60 frames
+    distances = np.linspace(15, 2.05, 60)[::lod] # 60 frames
+    rendered = parallel_map(render_frame, distances, processes=processes,
+                            initializer=_init_frame_worker, initargs=(universe, 1.0 / lod), chunksize=4)
     
-    for i, r in enumerate(distances):
-        view, shadow_r = apply_lensing(universe, r)
-        
-        # 2. Energy (Vision)
-        view, intensity = apply_blueshift(view, r)
-        
-        # Convert into uint8 for photos
-        img_uint8 = (view * 255).astype(np.uint8)
-        
-        # save frames
-        filename = f"{output_dir}/frame_{i:03d}.png"
-        imageio.imwrite(filename, img_uint8)
-        frames.append(img_uint8)
+    try:
+        frames_png = PngSequenceWriter(output_dir + "/frame_{:03d}.png") if lod == 1 else nullcontext()
+        with frames_png as pngs, open_writer(output, fps=15, palette=palette, delta=delta) as movie:
+            for i, (r, (img_uint8, intensity)) in enumerate(zip(distances, rendered)):
+                if pngs is not None:
+                    pngs.append(img_uint8)
+                movie.append(img_uint8)
+            
+                # progress bar in bash
+                if i % 10 == 0:
+                    print(f"Rendering frame {i}/{len(distances)} | r = {r:.2f}M | Energy = x{intensity:.1f}")
+
+            # --- SYSTEM CRASH ---
+            white_screen = np.ones((height, width, 3), dtype=np.uint8) * 255
+            for _ in range(max(5 // lod, 1)):
+                movie.append(white_screen)
         
-        # progress bar in bash
-        if i % 10 == 0:
-            print(f"Rendering frame {i}/60 | r = {r:.2f}M | Energy = x{intensity:.1f}")
-
-    # --- SYSTEM CRASH ---
-    white_screen = np.ones((height, width, 3), dtype=np.uint8) * 255
-    for _ in range(5):
-        frames.append(white_screen)
-    
-    black_screen = np.zeros((height, width, 3), dtype=np.uint8)
-    for _ in range(10):
-        frames.append(black_screen)
-
-    # Save GIF
-    gif_path = "output/Vision_Theory_Simulation.gif"
-    imageio.mimsave(gif_path, frames, fps=15)
-    print(f"[SUCCESS] Animation saved: {gif_path}")
+            black_screen = np.zeros((height, width, 3), dtype=np.uint8)
+            for _ in range(max(10 // lod, 1)):
+                movie.append(black_screen)
+    finally:
+        # In-process runs: do not keep the sky, the lensing maps and the buffers alive
+        _FRAME_STATE.clear()
+
+    print(f"[SUCCESS] Animation saved: {output}")
+    return output
 
 if __name__ == "__main__":
     create_animation()
\ No newline at end of file
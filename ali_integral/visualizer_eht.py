@@ -1,61 +1,56 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-import imageio
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import os
+from .profiling import span, traced
+from .utils import image_dtype, output_root, parallel_map
+from .writers import open_writer
 
-def generate_eht_animation():
+R_BASE = 4.0
+BULGE_ANGLE = np.pi / 4
+FIGURE_DPI = 100        # Animation frame dpi (14 x 7 in figure -> 1400 x 700 px)
+
+class EHTFrameRenderer:
     """
-    V11 Visualizer: Generates 'Perturbation.A' animation and static snapshot for PDF.
+    Renders 'Perturbation.A' frames with one persistent figure.
+
+    The grids, the static GR image and the Doppler field are computed once;
+    the two-panel figure, image artists, reference contour, annotation and
+    note are built once. A frame only recomputes R_dynamic / intensity_ali,
+    updates the right image in place and redraws the reused Agg canvas.
     """
-    print("[INFO] Rendering 'Perturbation.A' Visualization...")
-    output_dir = "output"
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        
-    RES = 500
-    x = np.linspace(-10, 10, RES)
-    y = np.linspace(-10, 10, RES)
-    X, Y = np.meshgrid(x, y)
-    R = np.sqrt(X**2 + Y**2)
-    THETA = np.arctan2(Y, X)
-    
-    frames = []
-    steps = 45
-    time_points = np.linspace(0, 2*np.pi, steps)
-    R_BASE = 4.0
-    
-    max_breath = 0
-    best_frame_path = f"{output_dir}/fig3_perturbation.png"
-    
-    for t in time_points:
-        # 1. Physics
-        intensity_gr = np.exp(-((R - R_BASE)**2) / 1.5)
-        doppler = 1 + 0.5 * (X / np.sqrt(X**2 + Y**2 + 0.1))
-        img_gr = intensity_gr * doppler
-        
-        # 2. Vision Theory (Perturbation.A)
-        breath = 0.35 * (0.5 * np.sin(t) + 0.5) # Pulsation
-        if breath > max_breath:
-            max_breath = breath # Track max deformation
-        
-        bulge_angle = np.pi / 4
-        bulge_shape = np.exp(-((THETA - bulge_angle)**2) / 0.6)
-        R_dynamic = R_BASE + (R_BASE * breath * bulge_shape)
-        
-        intensity_ali = np.exp(-((R - R_dynamic)**2) / 1.5)
-        img_ali = intensity_ali * doppler
-        
-        # 3. Plotting
-        fig, axes = plt.subplots(1, 2, figsize=(14, 7), facecolor='black')
+    def __init__(self, res=500, dtype=None, dpi=None):
+        dtype = image_dtype(dtype)
+        self.res = res
+        self.dpi = dpi
+        x = np.linspace(-10, 10, res, dtype=dtype)
+        y = np.linspace(-10, 10, res, dtype=dtype)
+        X, Y = np.meshgrid(x, y)
+        self.R = np.sqrt(X**2 + Y**2)
+        THETA = np.arctan2(Y, X)
+
+        # 1. Physics (frame invariant)
+        self.doppler = 1 + 0.5 * (X / np.sqrt(X**2 + Y**2 + 0.1))
+        intensity_gr = np.exp(-((self.R - R_BASE)**2) / 1.5)
+        self.img_gr = intensity_gr * self.doppler
+        self.bulge_shape = np.exp(-((THETA - BULGE_ANGLE)**2) / 0.6)
+        self._work = np.empty_like(self.R)
+
+        self._build_figure()
+
+    def _build_figure(self):
+        self.fig = Figure(figsize=(14, 7), facecolor='black', dpi=self.dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        axes = self.fig.subplots(1, 2)
         
         # Left
-        axes[0].imshow(img_gr, cmap='inferno', extent=[-10,10,-10,10], vmin=0, vmax=1.8)
+        axes[0].imshow(self.img_gr, cmap='inferno', extent=[-10,10,-10,10], vmin=0, vmax=1.8)
         axes[0].set_title("Standard GR Model\n(Static)", color='white', fontsize=16, pad=20)
         axes[0].axis('off')
         
         # Right
-        axes[1].imshow(img_ali, cmap='inferno', extent=[-10,10,-10,10], vmin=0, vmax=1.8)
+        self.im_ali = axes[1].imshow(self.img_gr, cmap='inferno', extent=[-10,10,-10,10], vmin=0, vmax=1.8)
         axes[1].set_title("Vision Theory Prediction\n(Information Pressure)", color='#00CCFF', fontsize=16, pad=20)
         axes[1].axis('off')
         
@@ -63,29 +58,104 @@ def generate_eht_animation():
         ref_circ = patches.Circle((0, 0), radius=R_BASE, edgecolor='white', facecolor='none', ls='--', lw=1, alpha=0.5)
         axes[1].add_patch(ref_circ)
         
-        if breath > 0.05:
-            target_x = (R_BASE + 1.5) * np.cos(bulge_angle)
-            target_y = (R_BASE + 1.5) * np.sin(bulge_angle)
-            
-            axes[1].annotate('Perturbation.A', 
-                             xy=(target_x, target_y), 
-                             xytext=(target_x + 3, target_y + 3),
-                             arrowprops=dict(facecolor='#00CCFF', edgecolor='none', arrowstyle='->', lw=2),
-                             color='#00CCFF', fontsize=14, fontfamily='sans-serif', weight='bold')
-
-        fig.text(0.5, 0.05, "Simulation Note: Deformation exaggerated 50x for clarity.", 
-                 color='gray', fontsize=10, ha='center', style='italic')
-        plt.subplots_adjust(top=0.85, bottom=0.1, left=0.05, right=0.95, wspace=0.1)
+        target_x = (R_BASE + 1.5) * np.cos(BULGE_ANGLE)
+        target_y = (R_BASE + 1.5) * np.sin(BULGE_ANGLE)
+        self.label = axes[1].annotate('Perturbation.A', 
+                                      xy=(target_x, target_y), 
+                                      xytext=(target_x + 3, target_y + 3),
+                                      arrowprops=dict(facecolor='#00CCFF', edgecolor='none', arrowstyle='->', lw=2),
+                                      color='#00CCFF', fontsize=14, fontfamily='sans-serif', weight='bold')
+
+        self.fig.text(0.5, 0.05, "Simulation Note: Deformation exaggerated 50x for clarity.", 
+                      color='gray', fontsize=10, ha='center', style='italic')
+        self.fig.subplots_adjust(top=0.85, bottom=0.1, left=0.05, right=0.95, wspace=0.1)
+
+    @staticmethod
+    def breath(t):
+        return 0.35 * (0.5 * np.sin(t) + 0.5) # Pulsation
+
+    def update(self, t):
+        """Set the figure to phase t; returns the breath amplitude."""
+        # 2. Vision Theory (Perturbation.A)
+        breath = self.breath(t)
         
-        # Render
-        fig.canvas.draw()
-        image = np.array(fig.canvas.renderer.buffer_rgba())[:, :, :3]
-        frames.append(image)
+        # R_dynamic = R_BASE + R_BASE * breath * bulge_shape, all in place
+        work = self._work
+        np.multiply(self.bulge_shape, R_BASE * breath, out=work)
+        work += R_BASE
+        np.subtract(self.R, work, out=work)
+        np.square(work, out=work)
+        work /= -1.5
+        np.exp(work, out=work)
+        work *= self.doppler
         
-        if breath >= 0.34: 
-            plt.savefig(best_frame_path, dpi=300)
-            
-        plt.close()
+        self.im_ali.set_data(work)
+        self.label.set_visible(breath > 0.05)
+        return breath
+
+    def render(self, t):
+        """RGB uint8 frame for phase t."""
+        self.update(t)
+        self.canvas.draw()
+        return np.array(self.canvas.buffer_rgba())[:, :, :3]
+
+    def savefig(self, path, dpi=300):
+        with span("savefig", path=path):
+            self.fig.savefig(path, dpi=dpi, facecolor=self.fig.get_facecolor())
+
+_RENDERER = {}
+
+def _init_eht_worker(res, dpi=None):
+    _RENDERER["eht"] = EHTFrameRenderer(res, dpi=dpi)
+
+@traced("visualizer_eht.frame")
+def render_eht_frame(task):
+    """task = (t, snapshot_path or None, snapshot dpi); needs _init_eht_worker."""
+    t, snapshot_path, snapshot_dpi = task
+    renderer = _RENDERER["eht"]
+    frame = renderer.render(t)
+    if snapshot_path:
+        renderer.savefig(snapshot_path, dpi=snapshot_dpi)
+    return frame
+
+@traced()
+def generate_eht_animation(processes=1, output=None, palette="adaptive", delta=False, lod=1):
+    """
+    V11 Visualizer: Generates 'Perturbation.A' animation and static snapshot for PDF.
+
+    processes > 1 (or None for all cores) renders frames on a process pool,
+    one EHTFrameRenderer per worker; frames come back in order and are
+    streamed into the animation file as they arrive.
+
+    lod > 1 is a preview: image resolution, figure dpi and frame count are
+    divided by lod and files go to config.PREVIEW_DIR.
+    """
+    print("[INFO] Rendering 'Perturbation.A' Visualization...")
+    output_dir = output_root(lod)
+    output = output or f"{output_dir}/The_Perturbation_A.gif"
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+        
+    steps = 45
+    time_points = np.linspace(0, 2*np.pi, steps)[::lod]
+    res = 500 // lod
+    dpi = FIGURE_DPI // lod
+    
+    # Snapshot for the PDF: the last frame at (near) maximum deformation
+    best_frame_path = f"{output_dir}/fig3_perturbation.png"
+    peaks = [i for i, t in enumerate(time_points) if EHTFrameRenderer.breath(t) >= 0.34]
+    tasks = [(t, best_frame_path if peaks and i == peaks[-1] else None, 300 // lod)
+             for i, t in enumerate(time_points)]
+    
+    frames = parallel_map(render_eht_frame, tasks, processes=processes,
+                          initializer=_init_eht_worker, initargs=(res, dpi), chunksize=3)
 
-    imageio.mimsave(f"{output_dir}/The_Perturbation_A.gif", frames, fps=15)
-    print("[SUCCESS] Animation and PDF Snapshot saved.")
\ No newline at end of file
+    try:
+        with open_writer(output, fps=15, palette=palette, delta=delta) as movie:
+            for frame in frames:
+                movie.append(frame)
+    finally:
+        # In-process runs: release the figure and its buffers
+        _RENDERER.clear()
+    print("[SUCCESS] Animation and PDF Snapshot saved.")
+    return output
\ No newline at end of file
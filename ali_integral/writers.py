@@ -0,0 +1,293 @@
+"""
+Streaming, bounded-memory output for the animators.
+
+Frames are appended one at a time; encoding (PNG, GIF frame quantization
++ LZW) runs on a small background thread pool and at most `max_pending`
+frames are in flight, so peak memory stays flat however long the sequence
+is. Encoded data is written strictly in append order.
+
+- PngSequenceWriter: one PNG per frame.
+- GifStreamWriter: animated GIF written incrementally (global header once,
+  then one encoded frame at a time). palette="adaptive" gives each frame
+  its own colour table, palette="reuse" quantizes every frame to the first
+  frame's palette; delta=True only stores the bounding box that changed.
+- VideoStreamWriter: MP4 / WebM through imageio's ffmpeg plugin
+  (needs the optional imageio-ffmpeg package).
+- write_png_stream: a single very large RGB PNG from row bands.
+
+Leaving a writer's `with` block through an exception aborts it instead of
+finalizing: queued frames are dropped and the partial output is removed.
+append() copies frames that are encoded in the background, so callers may
+reuse their frame buffer (e.g. to_uint8(..., out=...)).
+
+GifStreamWriter uses GifImagePlugin.getheader / getdata, Pillow's
+low-level GIF writers (the public save_all API needs every frame at
+once); setup.py pins the Pillow versions they are known to work with.
+"""
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import imageio
+import numpy as np
+
+from .profiling import span, traced
+
+MAX_PENDING = 8     # Frames encoded ahead of the file write
+ENCODE_WORKERS = 2
+
+class _OrderedPipeline:
+    """Background encoder with a bounded, ordered completion queue."""
+    def __init__(self, workers=ENCODE_WORKERS, max_pending=MAX_PENDING):
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._pending = deque()
+        self.max_pending = max_pending
+
+    def submit(self, fn, *args, on_done=None):
+        self._pending.append((self._pool.submit(fn, *args), on_done))
+        while len(self._pending) > self.max_pending:
+            self._complete_oldest()
+
+    def _complete_oldest(self):
+        future, on_done = self._pending.popleft()
+        result = future.result()
+        if on_done is not None:
+            on_done(result)
+
+    def close(self):
+        try:
+            while self._pending:
+                self._complete_oldest()
+        finally:
+            self._pool.shutdown(wait=True)
+
+    def abort(self):
+        """Drop queued frames and wait for the ones already encoding."""
+        self._pending.clear()
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+@traced("writers.png")
+def _write_png(path, frame):
+    imageio.imwrite(path, frame)
+
+class PngSequenceWriter:
+    """Writes frame i to pattern.format(i) in the background."""
+    def __init__(self, pattern, workers=ENCODE_WORKERS, max_pending=MAX_PENDING):
+        directory = os.path.dirname(pattern)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.pattern = pattern
+        self.count = 0
+        self._pipeline = _OrderedPipeline(workers, max_pending)
+
+    def append(self, frame):
+        frame = np.array(frame, copy=True)     # Encoded later: the caller may reuse its buffer
+        self._pipeline.submit(_write_png, self.pattern.format(self.count), frame)
+        self.count += 1
+
+    def close(self):
+        self._pipeline.close()
+
+    def abort(self):
+        """Stop writing and remove the frames written so far."""
+        self._pipeline.abort()
+        for i in range(self.count):
+            _remove(self.pattern.format(i))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+class GifStreamWriter:
+    """
+    Animated GIF built incrementally with Pillow's GIF encoder, so only
+    the frames in flight are held in memory (PIL's save_all keeps them all).
+    """
+    def __init__(self, path, fps=15, loop=0, palette="adaptive", delta=False,
+                 workers=ENCODE_WORKERS, max_pending=MAX_PENDING):
+        if palette not in ("adaptive", "reuse"):
+            raise ValueError(f"Unknown palette mode '{palette}'. Available: ['adaptive', 'reuse']")
+        self.path = path
+        self.duration = int(round(1000.0 / fps))
+        self.loop = loop
+        self.palette = palette
+        self.delta = delta
+        self.count = 0
+        self._file = open(path, "wb")
+        self._pipeline = _OrderedPipeline(workers, max_pending)
+        self._global = None
+        self._previous = None
+
+    def _to_palette(self, frame):
+        from PIL import Image
+
+        img = Image.fromarray(np.ascontiguousarray(frame, dtype=np.uint8))
+        if self.palette == "reuse" and self._global is not None:
+            return img.quantize(palette=self._global, dither=Image.Dither.NONE)
+        return img.quantize(256, dither=Image.Dither.NONE)
+
+    @traced("writers.gif_encode")
+    def _encode(self, frame, offset, full_frame):
+        from PIL import GifImagePlugin
+
+        im = self._to_palette(frame)
+        params = {"duration": self.duration, "disposal": 1 if self.delta else 0}
+        if self.palette == "adaptive" and not full_frame:
+            params["include_color_table"] = True
+        return b"".join(GifImagePlugin.getdata(im, offset=offset, **params))
+
+    def _write_header(self, frame):
+        from PIL import GifImagePlugin
+
+        # The first frame's palette becomes the global colour table
+        self._global = self._to_palette(frame)
+        header, _ = GifImagePlugin.getheader(self._global, info={"loop": self.loop, "duration": self.duration})
+        self._file.write(b"".join(header))
+
+    def append(self, frame):
+        frame = np.asarray(frame)
+        offset = (0, 0)
+        region = frame
+
+        if self.count == 0:
+            self._write_header(frame)
+        elif self.delta:
+            changed = np.any(frame != self._previous, axis=-1)
+            if changed.any():
+                rows = np.flatnonzero(changed.any(axis=1))
+                cols = np.flatnonzero(changed.any(axis=0))
+                y0, y1, x0, x1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+            else:
+                y0, y1, x0, x1 = 0, 1, 0, 1  # Unchanged: repaint one pixel
+            region = frame[y0:y1, x0:x1].copy()
+            offset = (int(x0), int(y0))
+
+        if self.delta:
+            self._previous = frame.copy()
+        if region is frame:
+            region = frame.copy()   # Encoded later: the caller may reuse its buffer
+
+        self._pipeline.submit(self._encode, region, offset, self.count == 0, on_done=self._write)
+        self.count += 1
+
+    def _write(self, data):
+        with span("writers.gif_write"):
+            self._file.write(data)
+
+    def close(self):
+        if self._file.closed:
+            return
+        try:
+            self._pipeline.close()
+            self._file.write(b";")
+        finally:
+            self._file.close()
+
+    def abort(self):
+        """Close without the trailer and remove the partial file."""
+        if self._file.closed:
+            return
+        try:
+            self._pipeline.abort()
+        finally:
+            self._file.close()
+            _remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+class VideoStreamWriter:
+    """MP4 / WebM via ffmpeg; frames are piped to the encoder as they come."""
+    def __init__(self, path, fps=15, **kwargs):
+        try:
+            self._writer = imageio.get_writer(path, fps=fps, **kwargs)
+        except (ImportError, ValueError, RuntimeError) as e:
+            raise RuntimeError(f"Video output needs the 'imageio-ffmpeg' package: {e}") from e
+        self.path = path
+        self.count = 0
+
+    @traced("writers.video_frame")
+    def append(self, frame):
+        self._writer.append_data(np.asarray(frame, dtype=np.uint8))
+        self.count += 1
+
+    def close(self):
+        self._writer.close()
+
+    def abort(self):
+        """Stop the encoder and remove the partial file."""
+        try:
+            self._writer.close()
+        finally:
+            _remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+def _png_chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+@traced()
+def write_png_stream(path, width, height, bands, level=6):
+    """
+    Write an 8-bit RGB PNG from an iterable of uint8 (rows, width, 3) bands.
+    Rows are deflated as they arrive, so the full image is never held in
+    memory. Raises ValueError if the bands do not add up to height rows;
+    on any error the partial file is removed.
+    """
+    compressor = zlib.compressobj(level)
+    rows = 0
+    try:
+        with open(path, "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\n")
+            f.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+            for band in bands:
+                band = np.ascontiguousarray(band, dtype=np.uint8).reshape(-1, width * 3)
+                # Filter type 0 (None) byte in front of every scanline
+                raw = np.zeros((band.shape[0], width * 3 + 1), dtype=np.uint8)
+                raw[:, 1:] = band
+                data = compressor.compress(raw.tobytes())
+                if data:
+                    f.write(_png_chunk(b"IDAT", data))
+                rows += band.shape[0]
+            if rows != height:
+                raise ValueError(f"PNG stream got {rows} rows, expected {height}")
+            f.write(_png_chunk(b"IDAT", compressor.flush()))
+            f.write(_png_chunk(b"IEND", b""))
+    except BaseException:
+        _remove(path)
+        raise
+
+def open_writer(path, fps=15, palette="adaptive", delta=False):
+    """GIF or video writer chosen by file extension (palette/delta: GIF only)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".gif":
+        return GifStreamWriter(path, fps=fps, palette=palette, delta=delta)
+    if ext in (".mp4", ".webm", ".mkv", ".mov"):
+        return VideoStreamWriter(path, fps=fps)
+    raise ValueError(f"Unsupported animation format '{ext}'. Available: ['.gif', '.mp4', '.webm']")
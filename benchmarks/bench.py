@@ -0,0 +1,314 @@
+"""
+Benchmark suite for the numerics and renderers.
+
+    python benchmarks/bench.py                 # run, append to history, compare to baseline
+    python benchmarks/bench.py -k lensing      # only cases whose id contains "lensing"
+    python benchmarks/bench.py --save-baseline # store this run as the new baseline
+    python benchmarks/bench.py --check         # exit 1 if anything regressed
+
+Every case runs at several problem sizes. Time is the best of --repeat
+runs (after one warm-up call); peak memory is the tracemalloc peak of one
+extra run, so tracing does not distort the timings. Each run appends one
+JSON line to results/history.jsonl (commit, versions, per-case results);
+results/baseline.json is the reference that --check compares against with
+a relative tolerance. Renderer cases run inside a temporary directory, so
+the repository's output/ is never touched.
+"""
+import argparse
+import contextlib
+import datetime
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import numpy as np
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+HISTORY = os.path.join(RESULTS_DIR, "history.jsonl")
+BASELINE = os.path.join(RESULTS_DIR, "baseline.json")
+TOLERANCE = 0.25        # Relative slowdown / memory growth flagged as a regression
+MIN_TIME = 1e-3         # Timings below this (s) are too noisy to flag
+
+class Case:
+    """
+    One benchmark at one size. setup() returns the state passed to run();
+    it is called once, outside the timed region.
+    """
+    def __init__(self, name, size, run, setup=None, repeat=None):
+        self.name = name
+        self.size = size
+        self.run = run
+        self.setup = setup or (lambda: None)
+        self.repeat = repeat    # Cap on timed runs for slow cases
+
+    @property
+    def id(self):
+        return f"{self.name}[{self.size}]"
+
+@contextlib.contextmanager
+def physics_steps(steps):
+    from ali_integral import physics
+    saved = physics.STEPS
+    physics.STEPS = steps
+    try:
+        yield
+    finally:
+        physics.STEPS = saved
+
+# --- Case definitions ---
+
+def _ali_integral(steps, n_masses):
+    def run(masses):
+        from ali_integral import physics
+        with physics_steps(steps):
+            physics.calculate_ali_integral(masses)
+    return Case("calculate_ali_integral", f"steps={steps},masses={n_masses}", run,
+                lambda: np.geomspace(1.0, 1e11, n_masses) if n_masses > 1 else 4.0e6)
+
+def _run_simulation(steps):
+    def run(_):
+        from ali_integral import physics
+        with physics_steps(steps):
+            physics.run_simulation()
+    return Case("run_simulation", f"steps={steps}", run)
+
+def _blueshift(n):
+    def setup():
+        from ali_integral.kerr_metric import calculate_horizons
+        r_plus, r_minus = calculate_horizons(1.0, 0.99)
+        return np.linspace(r_plus * 0.99, r_minus + 1e-4, n)
+
+    def run(r):
+        from ali_integral.kerr_metric import kerr_blueshift_factor
+        kerr_blueshift_factor(r, 1.0, 0.99)
+    return Case("kerr_blueshift_factor", f"n={n}", run, setup)
+
+def _lensing(width, height):
+    def setup():
+        from ali_integral.visualizer import generate_starfield
+        np.random.seed(0)
+        return generate_starfield(width, height)
+
+    def run(universe):
+        from ali_integral.visualizer import apply_lensing, apply_blueshift
+        view, _ = apply_lensing(universe, 4.0)
+        apply_blueshift(view, 4.0, out=view)
+    return Case("apply_lensing+blueshift", f"{width}x{height}", run, setup)
+
+def _eht_frame(res):
+    def setup():
+        from ali_integral.visualizer_eht import EHTFrameRenderer
+        return EHTFrameRenderer(res)
+
+    def run(renderer):
+        renderer.render(np.pi / 2)
+    return Case("eht_animation_frame", f"res={res}", run, setup)
+
+def _shadow(lod):
+    def run(_):
+        from ali_integral.eht_imaging import generate_shadow_image
+        with contextlib.redirect_stdout(None):
+            generate_shadow_image(0.5, output_dir="output", lod=lod)
+    return Case("generate_shadow_image", f"res={500 // lod}", run)
+
+def _plots(steps):
+    def setup():
+        from ali_integral import physics
+        with physics_steps(steps):
+            return physics.run_simulation()
+
+    def run(results):
+        from ali_integral.plotting import generate_plots
+        with contextlib.redirect_stdout(None):
+            generate_plots(results)
+    return Case("generate_plots", f"steps={steps}", run, setup)
+
+def _pdf():
+    def setup():
+        from ali_integral import physics
+        from ali_integral.plotting import generate_plots
+        from ali_integral.visualizer_eht import EHTFrameRenderer
+        font = os.path.join(ROOT, "DejaVuSans.ttf")
+        if not os.path.exists(font):
+            return None
+        with contextlib.redirect_stdout(None):
+            generate_plots(physics.run_simulation())
+        EHTFrameRenderer(250).savefig("output/fig3_perturbation.png")
+        shutil.copy(font, "DejaVuSans.ttf")
+        return "DejaVuSans.ttf"
+
+    def run(font):
+        if font is None:
+            raise SkipCase("DejaVuSans.ttf not found")
+        from ali_integral.pdf_generator import build_pdf
+        with contextlib.redirect_stdout(None):
+            build_pdf(font)
+    return Case("build_pdf", "report", run, setup, repeat=1)
+
+def _catalog():
+    def setup():
+        from ali_integral import physics
+        font = os.path.join(ROOT, "DejaVuSans.ttf")
+        if not os.path.exists(font):
+            return None
+        shutil.copy(font, "DejaVuSans.ttf")
+        return physics.run_simulation()
+
+    def run(results):
+        if results is None:
+            raise SkipCase("DejaVuSans.ttf not found")
+        from ali_integral.pdf_generator import ReportEngine
+        with contextlib.redirect_stdout(None):
+            ReportEngine("DejaVuSans.ttf").catalog(results)
+    return Case("report_catalog", "targets=3", run, setup)
+
+def all_cases():
+    return [
+        _ali_integral(5000, 1), _ali_integral(50000, 1), _ali_integral(5000, 1000),
+        _run_simulation(5000), _run_simulation(50000),
+        _blueshift(10**4), _blueshift(10**6),
+        _lensing(320, 180), _lensing(640, 360), _lensing(1280, 720),
+        _eht_frame(250), _eht_frame(500),
+        _shadow(2), _shadow(1),
+        _plots(5000), _plots(50000),
+        _pdf(), _catalog(),
+    ]
+
+class SkipCase(Exception):
+    pass
+
+# --- Measurement ---
+
+def measure(case, repeat=3):
+    """{"time": best wall seconds, "mean": mean seconds, "peak_bytes": tracemalloc peak}."""
+    state = case.setup()
+    case.run(state)     # Warm-up: imports, caches, lazy tables
+
+    times = []
+    for _ in range(min(repeat, case.repeat or repeat)):
+        gc.collect()
+        start = time.perf_counter()
+        case.run(state)
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"time": min(times), "mean": sum(times) / len(times), "peak_bytes": peak}
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """
+    Regressions of results against baseline: list of (case id, metric,
+    baseline value, new value) where new exceeds baseline by > tolerance.
+    """
+    regressions = []
+    for case_id, new in results.items():
+        old = baseline.get(case_id)
+        if old is None:
+            continue
+        if new["time"] > MIN_TIME and new["time"] > old["time"] * (1 + tolerance):
+            regressions.append((case_id, "time", old["time"], new["time"]))
+        if new["peak_bytes"] > old["peak_bytes"] * (1 + tolerance) + 2**20:
+            regressions.append((case_id, "peak_bytes", old["peak_bytes"], new["peak_bytes"]))
+    return regressions
+
+def _commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run_suite(pattern=None, repeat=3):
+    cases = [c for c in all_cases() if pattern is None or pattern in c.id]
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.makedirs("output")
+        try:
+            for case in cases:
+                try:
+                    results[case.id] = measure(case, repeat)
+                except SkipCase as e:
+                    print(f"[INFO] {case.id:<55} skipped: {e}")
+                    continue
+                r = results[case.id]
+                print(f"{case.id:<55} {r['time'] * 1e3:10.2f} ms {r['peak_bytes'] / 2**20:10.1f} MiB")
+        finally:
+            os.chdir(cwd)
+    return results
+
+def record(results, path=HISTORY):
+    import matplotlib
+    entry = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(entry, sort_keys=True) + "\n")
+    return entry
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="pattern", default=None, help="only cases whose id contains this")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 on regressions")
+    parser.add_argument("--no-history", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.pattern, args.repeat)
+    if not args.no_history:
+        record(results)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE):
+            with open(BASELINE) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(BASELINE, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"[SUCCESS] Baseline saved: {BASELINE}")
+        return 0
+
+    if not os.path.exists(BASELINE):
+        print("[INFO] No baseline yet (run with --save-baseline).")
+        return 0
+
+    with open(BASELINE) as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for case_id, metric, old, new in regressions:
+        print(f"[REGRESSION] {case_id} {metric}: {old:.4g} -> {new:.4g} (x{new / old:.2f})")
+    if not regressions:
+        print("[SUCCESS] No regressions against the baseline.")
+    return 1 if regressions and args.check else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,8 +17,17 @@ setup(
         'numpy',
         'matplotlib',
         'scipy',
-        'imageio'
+        'imageio',
+        # pdf_generator copies fpdf 1.7's internal font / image entries
+        'fpdf>=1.7.2,<1.8',
+        # writers.GifStreamWriter uses GifImagePlugin.getheader / getdata
+        'Pillow>=10.0,<13'
     ],
+    entry_points={
+        'console_scripts': [
+            'ali-integral=ali_integral.cli:main',
+        ],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,27 @@
+import importlib.util
+import os
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_spec = importlib.util.spec_from_file_location("bench", os.path.join(ROOT, "benchmarks", "bench.py"))
+bench = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(bench)
+
+class TestBench(unittest.TestCase):
+    def test_measure_and_compare(self):
+        case = bench._blueshift(1000)
+        result = bench.measure(case, repeat=2)
+        self.assertGreater(result["time"], 0.0)
+        self.assertGreater(result["peak_bytes"], 0)
+
+        baseline = {"a": {"time": 1.0, "peak_bytes": 100 * 2**20}, "b": {"time": 1.0, "peak_bytes": 2**20}}
+        results = {
+            "a": {"time": 1.2, "peak_bytes": 100 * 2**20},   # within tolerance
+            "b": {"time": 2.0, "peak_bytes": 8 * 2**20},     # slower and larger
+            "c": {"time": 9.0, "peak_bytes": 2**30},         # not in the baseline
+        }
+        found = bench.compare(results, baseline, tolerance=0.25)
+        self.assertEqual(sorted((r[0], r[1]) for r in found), [("b", "peak_bytes"), ("b", "time")])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+from ali_integral import cli, physics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestCli(unittest.TestCase):
+    def run_cli(self, *argv):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            code = cli.main(list(argv))
+        return code, out.getvalue()
+
+    def test_import_is_lazy(self):
+        code = ("import sys, ali_integral; "
+                "assert 'numpy' not in sys.modules and 'matplotlib' not in sys.modules; "
+                "ali_integral.get_mass; assert 'scipy' not in sys.modules; "
+                "print(ali_integral.run('TON618', verbose=False))")
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(out.returncode, 0, out.stderr)
+        self.assertAlmostEqual(float(out.stdout), physics.calculate_ali_integral(6.6e10), delta=1e6)
+
+    def test_compute(self):
+        code, out = self.run_cli("compute", "TON618")
+        self.assertEqual(code, 0)
+        self.assertAlmostEqual(float(out) / physics.calculate_ali_integral(6.6e10), 1.0, places=6)
+
+        code, out = self.run_cli("compute", "TON 618", "--model", "kerr", "--json")
+        res = json.loads(out)
+        self.assertEqual(res["a"], 0.99)
+        self.assertEqual(res["I_Ali"], physics.simulate_hole(6.6e10, 0.99)["I_Ali"])
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(self.run_cli("compute", "Nowhere")[0], 1)
+
+    def test_rejects_and_reports_bad_input(self):
+        err = io.StringIO()
+        with contextlib.redirect_stderr(err), self.assertRaises(SystemExit) as exit:
+            self.run_cli("compute", "TON618", "--steps", "100")
+        self.assertEqual(exit.exception.code, 2)
+        self.assertIn("--steps only applies to the kerr model", err.getvalue())
+        # With the Kerr model --steps is used
+        code, out = self.run_cli("compute", "TON 618", "--spin", "0.5", "--steps", "400", "--json")
+        self.assertEqual(json.loads(out)["I_Ali"], physics.simulate_hole(6.6e10, 0.5, steps=400)["I_Ali"])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "missing", "grid.csv")
+            err = io.StringIO()
+            with contextlib.redirect_stderr(err):
+                code, _ = self.run_cli("sweep", "--grid", "M=10", "--grid", "a=0", "--steps", "400",
+                                       "--output", path, "-j", "1")
+        self.assertEqual(code, 1)
+        self.assertTrue(err.getvalue().startswith("[ERROR]"))
+
+    def test_sweep_to_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "grid.npy")
+            code, _ = self.run_cli("sweep", "--grid", "M=10,100", "--grid", "a=0,0.5",
+                                   "--steps", "400", "--output", path, "-j", "1")
+            self.assertEqual(code, 0)
+            table = np.load(path)
+        self.assertEqual(len(table), 4)
+        self.assertEqual(table["I_Ali"][3], physics.simulate_hole(100.0, 0.5, steps=400)["I_Ali"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,19 @@
+import os
+import tempfile
 import unittest
-from ali_integral.physics import run_simulation
+from unittest import mock
+import numpy as np
+from ali_integral.physics import run_simulation, calculate_ali_integral, HOLES
+from ali_integral.physics import simulate_hole
+from ali_integral.sweep import run_sweep
+from ali_integral.adaptive import simulate_hole_adaptive
+from ali_integral import cache, montecarlo, physics
+from ali_integral.kernel import mass_kernel, flux_kernel
+from ali_integral.sensitivity import simulate_hole_with_gradient
+from ali_integral.montecarlo import dimensionless_integral, run_monte_carlo
+from ali_integral.information import InformationIndex
+from ali_integral.streaming import integrate_streaming
+from ali_integral.kerr_metric import calculate_horizons, kerr_blueshift_factor, get_blueshift_table
 
 class TestAliIntegral(unittest.TestCase):
     def test_stellar_mass_integral(self):
@@ -8,11 +22,161 @@ class TestAliIntegral(unittest.TestCase):
         self.assertGreater(ofi, 0, "OFI должно быть больше 0")
         self.assertLess(ofi, 1e50, "OFI не должно быть бесконечным (физический предел)")
 
+        # The catalog run keeps its own 5000-step grid whatever config.STEPS is
+        with mock.patch.object(physics, "STEPS", 800):
+            self.assertEqual(run_simulation()["Stellar BH"]["I_Ali"], ofi)
+
     def test_mass_scaling(self):
         results = run_simulation()
         small = results["Stellar BH"]["I_Ali"]
         huge = results["TON 618"]["I_Ali"]
         self.assertGreater(huge, small, "TON 618 должна давать больше данных, чем обычная дыра")
 
+    def test_batch_matches_scalar(self):
+        masses = np.geomspace(1.0, 1e11, 600).reshape(20, 30)
+        batch, crash = calculate_ali_integral(masses, return_crash_index=True)
+        self.assertEqual(batch.shape, masses.shape)
+        self.assertEqual(crash.shape, masses.shape)
+        scalar = np.array([calculate_ali_integral(m) for m in masses.ravel()])
+        np.testing.assert_allclose(batch.ravel(), scalar, rtol=1e-12)
+
+    def test_sweep_matches_run_simulation(self):
+        results = run_simulation()
+        masses = [p["M"] for p in HOLES.values()]
+        spins = [p["a"] for p in HOLES.values()]
+        table = run_sweep({"M": masses, "a": spins}, processes=2, chunk_size=4)
+        self.assertEqual(len(table), len(masses) * len(spins))
+        for name, params in HOLES.items():
+            row = table[(table["M"] == params["M"]) & (table["a"] == params["a"])]
+            self.assertEqual(row["I_Ali"][0], results[name]["I_Ali"])
+
+    def test_adaptive_converges_to_fine_grid(self):
+        for params in HOLES.values():
+            adaptive = simulate_hole_adaptive(params["M"], params["a"], rtol=1e-8)
+            fine = simulate_hole(params["M"], params["a"], steps=200000)
+            self.assertLess(adaptive["n_eval"], 5000)
+            self.assertAlmostEqual(adaptive["I_Ali"] / fine["I_Ali"], 1.0, delta=2e-3)
+
+    def test_cache_keys_on_constants(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = cache.configure(disk_dir=tmp)
+            first = cache.run_simulation()
+            self.assertEqual(cache.run_simulation()["TON 618"]["I_Ali"], first["TON 618"]["I_Ali"])
+            self.assertEqual((store.hits, store.misses), (1, 1))
+
+            # Fresh process view: the disk store answers
+            store = cache.configure(disk_dir=tmp)
+            cache.run_simulation()
+            self.assertEqual(store.hits, 1)
+
+            original = physics.C_LIMIT
+            physics.C_LIMIT = original / 10
+            try:
+                cache.run_simulation()
+            finally:
+                physics.C_LIMIT = original
+            self.assertEqual(store.misses, 1)
+        cache.configure()
+
+        # config.py is part of the source fingerprint
+        with mock.patch.object(cache.config, "__file__", cache.physics.__file__):
+            self.assertNotEqual(cache._source_digest(), cache._SOURCE_DIGEST)
+
+    def test_cache_walks_store_only_when_over_budget(self):
+        blob = np.zeros(1000)   # About 8 KB pickled
+        with tempfile.TemporaryDirectory() as tmp:
+            store = cache.ResultCache(disk_dir=tmp, max_disk_bytes=30000)
+            with mock.patch.object(store, "_evict_disk", wraps=store._evict_disk) as walk:
+                for i in range(3):
+                    key = f"{i:02d}" + "0" * 62
+                    store.put(key, blob)
+                    os.utime(store._path(key), (1000 + i, 1000 + i))
+                self.assertEqual(walk.call_count, 1)    # First write only
+                store.put("00" + "0" * 62, blob)        # Rewrite: same size, newest
+                self.assertEqual(walk.call_count, 1)
+                store.put("03" + "0" * 62, blob)
+                self.assertEqual(walk.call_count, 2)
+            files = [n for _, _, names in os.walk(tmp) for n in names]
+            self.assertEqual(len(files), 3)
+            self.assertNotIn("01" + "0" * 62 + ".pkl", files)   # Least recently written
+
+    def test_mass_kernel_scales_exactly(self):
+        results = run_simulation()
+        for name, params in HOLES.items():
+            kernel = mass_kernel(params["a"])
+            self.assertAlmostEqual(kernel(params["M"]) / results[name]["I_Ali"], 1.0, places=12)
+            kernel.validate()
+        flux_kernel().validate()
+
+    def test_kerr_metric_broadcasts_over_spin(self):
+        spins = np.array([0.0, 0.6, 0.99, 1.2])
+        r_plus, r_minus = calculate_horizons(1.0, spins)
+        for i, a in enumerate(spins):
+            self.assertEqual((r_plus[i], r_minus[i]), calculate_horizons(1.0, float(a)))
+
+        r = r_minus[:, None] + np.linspace(0.01, 0.99, 200) * (r_plus - r_minus)[:, None]
+        g = kerr_blueshift_factor(r, 1.0, spins[:, None])
+        self.assertEqual(g.shape, r.shape)
+
+        table = get_blueshift_table()
+        rel = np.abs(table(r, spins[:, None]) / g - 1.0)
+        self.assertLessEqual(rel.max(), table.max_rel_error)
+
+    def test_streaming_matches_full_grid(self):
+        for params in HOLES.values():
+            for t_melt in (3500.0, 1500.0):
+                full = simulate_hole(params["M"], params["a"], steps=20001, t_melt=t_melt)
+                stream = integrate_streaming(params["M"], params["a"], steps=20001, block_size=999, t_melt=t_melt)
+                self.assertEqual(stream["crash_idx"], len(full["tau"]))
+                self.assertAlmostEqual(stream["I_Ali"] / full["I_Ali"], 1.0, places=12)
+
+    def test_information_index_queries(self):
+        data = run_simulation()["Sgr A*"]
+        index = InformationIndex.from_result(data)
+        self.assertAlmostEqual(index.total_bits / data["I_Ali"], 1.0, places=2)
+
+        tau = data["tau"][[10, 1000, 3000]]
+        np.testing.assert_allclose(index.bits_at_tau(tau), data["cumulative"][[10, 1000, 3000]])
+        np.testing.assert_allclose(index.tau_at_bits(index.bits_at_tau(tau)), tau, rtol=1e-9)
+        self.assertTrue(np.isnan(index.tau_at_temperature(1e9)))
+
+    def test_gradient_matches_finite_differences(self):
+        # TON 618 with a lower melting point crashes mid-journey, so the
+        # t_melt derivative is carried entirely by the crash-boundary term
+        M, a, t_melt = 6.6e10, 0.99, 1500.0
+        res = simulate_hole_with_gradient(M, a, steps=100001, t_melt=t_melt)
+        for name, base in (("b0", physics.B0), ("snr0", physics.SNR0), ("t_melt", t_melt)):
+            h = base * 1e-4
+            hi = simulate_hole_adaptive(M, a, **{"t_melt": t_melt, name: base + h})["I_Ali"]
+            lo = simulate_hole_adaptive(M, a, **{"t_melt": t_melt, name: base - h})["I_Ali"]
+            self.assertAlmostEqual(res["grad"][name] / ((hi - lo) / (2 * h)), 1.0, delta=1e-2)
+        self.assertNotEqual(res["boundary"]["t_melt"], 0.0)
+
+    def test_monte_carlo_batch_and_reproducibility(self):
+        spins = np.array([0.0, 0.6, 0.99])
+        for t_melt in (3500.0, 1500.0):
+            J = dimensionless_integral(spins, t_melt=t_melt)
+            ref = [simulate_hole(1.0, a, t_melt=t_melt)["I_Ali"] for a in spins]
+            np.testing.assert_allclose(J, ref, rtol=1e-12)
+
+        # Small tasks, so n=5000 is split into 5 tasks / RNG streams over 2 workers
+        with mock.patch.object(montecarlo, "SAMPLES_PER_TASK", 1000):
+            table = run_monte_carlo(4.0e6, 0.6, n=5000, seed=7, processes=1, return_samples=True)
+            pooled = run_monte_carlo(4.0e6, 0.6, n=5000, seed=7, processes=2, return_samples=True)
+            exact = run_monte_carlo(4.0e6, 0.6, n=5000, seed=7, processes=1, method="exact")
+        np.testing.assert_array_equal(table["samples"], pooled["samples"])
+        self.assertEqual(table["mean"], pooled["mean"])
+        self.assertAlmostEqual(table["quantiles"][0.5] / exact["quantiles"][0.5], 1.0, delta=1e-3)
+
+    def test_monte_carlo_uses_caller_parameters(self):
+        for method in ("exact", "table"):
+            for sigma_b0 in (0.0, 0.1):
+                kwargs = dict(n=2000, seed=1, processes=1, method=method, sigma_M=0, sigma_a=0, sigma_b0=sigma_b0)
+                base = run_monte_carlo(4.0e6, 0.6, **kwargs)["mean"]
+                doubled = run_monte_carlo(4.0e6, 0.6, b0=2 * physics.B0, **kwargs)["mean"]
+                self.assertAlmostEqual(doubled / base, 2.0, places=12)
+        with self.assertRaises(ValueError):
+            run_monte_carlo(4.0e6, 0.6, n=0)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,89 @@
+import functools
+import os
+import tempfile
+import unittest
+from ali_integral.pipeline import Stage, build, plan, load_manifest
+
+CALLS = []
+
+def make_value():
+    CALLS.append("value")
+    return 21
+
+def make_file(value, path):
+    CALLS.append(os.path.basename(path))
+    with open(path, "w") as f:
+        f.write(str(2 * value))
+
+def write_file(path, value):
+    with open(path, "w") as f:
+        f.write(str(2 * value))
+
+def missing_input(value):
+    with open("does-not-exist.dat") as f:
+        return f.read()
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        CALLS.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        d = self.tmp.name
+        self.src = os.path.join(d, "source.py")
+        with open(self.src, "w") as f:
+            f.write("x = 1\n")
+        self.manifest = os.path.join(d, ".build", "manifest.json")
+        out_a, out_b = os.path.join(d, "a.txt"), os.path.join(d, "b.txt")
+        self.stages = [
+            Stage("value", make_value),
+            Stage("a", lambda value: make_file(value, out_a), deps=["value"], sources=[self.src], outputs=[out_a]),
+            Stage("b", lambda value: make_file(value, out_b), deps=["value"], outputs=[out_b]),
+        ]
+        self.out_a = out_a
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_incremental_rebuild(self):
+        self.assertEqual(build(stages=self.stages, manifest_path=self.manifest), ["value", "a", "b"])
+        with open(self.out_a) as f:
+            self.assertEqual(f.read(), "42")
+
+        # Everything up to date: nothing runs, not even the value stage
+        CALLS.clear()
+        self.assertEqual(build(stages=self.stages, manifest_path=self.manifest), [])
+        self.assertEqual(CALLS, [])
+
+        # A source edit only rebuilds its stage (plus the values it needs)
+        with open(self.src, "a") as f:
+            f.write("y = 2\n")
+        self.assertEqual(plan(self.stages, load_manifest(self.manifest)), ["value", "a"])
+        build(stages=self.stages, manifest_path=self.manifest)
+        self.assertEqual(CALLS, ["value", "a.txt"])
+
+        # A missing artifact is rebuilt as well
+        os.remove(self.out_a)
+        self.assertEqual(plan(self.stages, load_manifest(self.manifest)), ["value", "a"])
+        self.assertEqual(plan(self.stages, load_manifest(self.manifest), force=True), ["value", "a", "b"])
+
+    def test_parallel_wave_records_finished_stages(self):
+        d = self.tmp.name
+        out_a, out_c = os.path.join(d, "a.txt"), os.path.join(d, "c.txt")
+        stages = [
+            Stage("value", make_value),
+            Stage("a", functools.partial(write_file, out_a), deps=["value"], outputs=[out_a]),
+            Stage("c", missing_input, deps=["value"], outputs=[out_c]),
+        ]
+        with self.assertRaises(FileNotFoundError):
+            build(processes=2, stages=stages, manifest_path=self.manifest)
+        # The sibling that finished is recorded, the failed stage is not
+        self.assertEqual(set(load_manifest(self.manifest)), {"a"})
+        self.assertEqual(plan(stages, load_manifest(self.manifest)), ["value", "c"])
+
+        stages[2] = Stage("c", functools.partial(write_file, out_c), deps=["value"], outputs=[out_c])
+        self.assertEqual(build(processes=2, stages=stages, manifest_path=self.manifest), ["value", "c"])
+        with open(out_c) as f:
+            self.assertEqual(f.read(), "42")
+        self.assertEqual(build(processes=2, stages=stages, manifest_path=self.manifest), [])
+
+if __name__ == '__main__':
+    unittest.main()
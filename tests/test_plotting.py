@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from ali_integral import physics
+from ali_integral.plotting import lttb_indices, decimate, plot_batch, generate_plots
+
+class TestPlotting(unittest.TestCase):
+    def test_lttb_keeps_shape(self):
+        x = np.linspace(0, 1, 10001)
+        y = np.sin(20 * x)
+        y[7000] = 5.0  # isolated spike
+        idx = lttb_indices(x, y, 500)
+        self.assertEqual(len(idx), 500)
+        self.assertEqual((idx[0], idx[-1]), (0, 10000))
+        self.assertTrue(np.all(np.diff(idx) > 0))
+        self.assertIn(7000, idx)
+        np.testing.assert_array_equal(lttb_indices(x[:100], y[:100], 500), np.arange(100))
+
+        xs, ys = decimate(x, np.exp(y), 300, log=True)
+        self.assertEqual(len(xs), 300)
+        self.assertEqual(ys.max(), np.exp(5.0))
+
+    def test_batch_plots_arbitrary_keys(self):
+        sets = {
+            "spin_0": {"A": physics.simulate_hole(10.0, 0.0), "B": physics.simulate_hole(1e3, 0.5, steps=800)},
+            "spin_9": {"A": physics.simulate_hole(10.0, 0.9), "B": physics.simulate_hole(1e3, 0.99),
+                       "C": physics.simulate_hole(4e6, 0.6)},
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            plot_batch(sets, output_dir=tmp, dpi=40)
+            for label in sets:
+                for fig in ("fig1_capacity", "fig2_scaling", "fig3_thermal", "fig4_cumulative"):
+                    self.assertTrue(os.path.exists(os.path.join(tmp, label, f"{fig}.png")))
+
+            generate_plots(sets["spin_9"], output_dir=tmp, primary="C")
+            self.assertTrue(os.path.exists(os.path.join(tmp, "eq_temp.png")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from ali_integral import physics, profiling
+
+def _square(x):
+    with profiling.span("square"):
+        return x * x
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        profiling.reset()
+
+    def tearDown(self):
+        profiling.disable()
+        profiling.reset()
+
+    def test_disabled_records_nothing(self):
+        with profiling.span("block"):
+            physics.calculate_ali_integral(10.0)
+        self.assertEqual(profiling.events(), [])
+
+    def test_spans_and_summary(self):
+        profiling.enable(memory=True)
+        with profiling.span("outer"):
+            for m in (10.0, 4.0e6):
+                physics.calculate_ali_integral(m)
+            buffer = bytearray(4 * 2**20)
+            del buffer
+        profiling.disable()
+
+        rows = {r["name"]: r for r in profiling.summary_rows()}
+        self.assertEqual(rows["physics.calculate_ali_integral"]["calls"], 2)
+        self.assertEqual(rows["outer"]["calls"], 1)
+        self.assertGreaterEqual(rows["outer"]["wall_s"], rows["physics.calculate_ali_integral"]["wall_s"])
+        # The 4 MiB buffer is allocated after the nested spans reset the peak
+        self.assertGreaterEqual(rows["outer"]["peak_bytes"], 4 * 2**20)
+        self.assertIn("physics.calculate_ali_integral", profiling.summary())
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = profiling.write_trace(os.path.join(tmp, "trace.json"))
+            with open(path) as f:
+                trace = json.load(f)["traceEvents"]
+        spans = [e for e in trace if e["ph"] == "X"]
+        self.assertEqual(len(spans), 3)
+        self.assertEqual(min(e["ts"] for e in spans), 0.0)
+
+    def test_pool_map_collects_worker_spans(self):
+        profiling.enable()
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            self.assertEqual(list(profiling.pool_map(pool, _square, range(4))), [0, 1, 4, 9])
+        spans = [e for e in profiling.events() if e["name"] == "square"]
+        self.assertEqual(len(spans), 4)
+        self.assertNotIn(os.getpid(), {e["pid"] for e in spans})
+
+    def test_pool_as_completed_reports_failures(self):
+        profiling.enable()
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            done = {item: (result, error) for item, result, error in
+                    profiling.pool_as_completed(pool, _square, [2, 3, "x"])}
+        self.assertEqual((done[2], done[3]), ((4, None), (9, None)))
+        self.assertIsNone(done["x"][0])
+        self.assertIsInstance(done["x"][1], TypeError)
+        self.assertEqual(len([e for e in profiling.events() if e["name"] == "square"]), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from fpdf import FPDF
+from PIL import Image
+from ali_integral import pdf_generator, physics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestReport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        os.makedirs("output")
+        shutil.copy(os.path.join(ROOT, "DejaVuSans.ttf"), "DejaVuSans.ttf")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_prepare_figure(self):
+        rgba = np.zeros((600, 1200, 4), dtype=np.uint8)
+        rgba[..., 3] = 255
+        rgba[100:200, :, :3] = 200
+        rgba[300:, :, 3] = 0            # Transparent: flattened onto white
+        Image.fromarray(rgba).save("output/fig.png")
+
+        path = pdf_generator.prepare_figure("output/fig.png", width_mm=100, dpi=150)
+        image = Image.open(path)
+        self.assertEqual(image.size, (591, 296))
+        self.assertEqual(image.mode, "P")
+        self.assertEqual(image.convert("RGB").getpixel((10, 250)), (255, 255, 255))
+        self.assertEqual(image.convert("RGB").getpixel((10, 70)), (200, 200, 200))
+        # Same content again (e.g. a re-rendered figure) hits the cache
+        os.utime("output/fig.png", None)
+        self.assertEqual(pdf_generator.prepare_figure("output/fig.png", width_mm=100, dpi=150), path)
+
+    def test_prepare_figure_is_lossless_for_line_art(self):
+        rng = np.random.default_rng(0)
+        for n_colors, mode in ((200, "P"), (1000, "RGB")):
+            palette = rng.integers(0, 256, (n_colors, 3), dtype=np.uint8)
+            rgb = palette[rng.integers(0, n_colors, (120, 200))]
+            Image.fromarray(rgb).save(f"output/art_{n_colors}.png")
+            path = pdf_generator.prepare_figure(f"output/art_{n_colors}.png", width_mm=200, dpi=150)
+            image = Image.open(path)
+            self.assertTrue(path.endswith(".png"))
+            self.assertEqual(image.mode, mode)
+            np.testing.assert_array_equal(np.asarray(image.convert("RGB")), rgb)
+
+    def test_image_cache_eviction(self):
+        paths = []
+        for i in range(4):
+            Image.new("RGB", (64, 64), (i, 0, 0)).save(f"output/f{i}.png")
+            paths.append(pdf_generator.prepare_figure(f"output/f{i}.png", width_mm=10))
+            os.utime(paths[-1], (i, i))     # Distinct access order
+        pdf_generator._evict_images(max_bytes=os.path.getsize(paths[0]) * 2)
+        self.assertEqual([os.path.exists(p) for p in paths], [False, False, True, True])
+
+    def test_documents_share_font_metrics_and_images(self):
+        Image.new("RGBA", (1200, 600), (255, 255, 255, 255)).save("output/fig.png")
+        engine = pdf_generator.ReportEngine("DejaVuSans.ttf")
+        docs = []
+        with mock.patch.object(FPDF, "_parsepng", autospec=True, side_effect=FPDF._parsepng) as parse:
+            for text in ("First: \u00c4 \u03a9", "Second: \u222b \u03c4"):
+                pdf = engine.document()
+                pdf.body_text(text)
+                pdf.figure("output/fig.png", x=25, w=160)
+                docs.append(pdf)
+        self.assertEqual(parse.call_count, 1)
+
+        first, second = (pdf.fonts["scifont"] for pdf in docs)
+        self.assertIs(second["cw"], first["cw"])            # Metrics parsed once
+        self.assertEqual((first["i"], second["i"]), (1, 1))
+        self.assertIn(ord("\u222b"), second["subset"])
+        self.assertNotIn(ord("\u222b"), first["subset"])    # Subsets stay per document
+        self.assertNotIn(ord("\u00c4"), second["subset"])
+
+        (name,) = docs[0].images
+        self.assertEqual(list(docs[1].images), [name])
+        self.assertIsNot(docs[1].images[name], docs[0].images[name])
+        self.assertEqual(docs[1].images[name]["i"], 1)
+
+        for pdf in docs:
+            raw = pdf.output(dest="S").encode("latin1")
+            self.assertEqual(raw.count(b"/FontFile2"), 1)
+            self.assertEqual(raw.count(b"/Subtype /Image"), 1)
+            self.assertEqual(len(re.findall(rb"/Type /Page\b(?!s)", raw)), 1)
+
+    def test_unknown_fpdf_layout_skips_caches(self):
+        Image.new("RGB", (1200, 600), (255, 255, 255)).save("output/fig.png")
+        engine = pdf_generator.ReportEngine("DejaVuSans.ttf")
+        with mock.patch.object(pdf_generator, "_FONT_KEYS", {"no-such-key"}), \
+                mock.patch.object(pdf_generator, "_IMAGE_KEYS", {"no-such-key"}), \
+                mock.patch.object(FPDF, "add_font", autospec=True, side_effect=FPDF.add_font) as add_font, \
+                mock.patch.object(FPDF, "_parsepng", autospec=True, side_effect=FPDF._parsepng) as parse:
+            for _ in range(2):
+                pdf = engine.document()
+                pdf.figure("output/fig.png", x=25, w=160)
+                raw = pdf.output(dest="S").encode("latin1")
+                self.assertEqual(raw.count(b"/FontFile2"), 1)
+                self.assertEqual(raw.count(b"/Subtype /Image"), 1)
+        self.assertEqual((add_font.call_count, parse.call_count), (2, 2))
+
+    def test_paper_and_catalog(self):
+        Image.new("RGBA", (2400, 1350), (255, 255, 255, 255)).save("output/fig1_capacity.png")
+        # Equation images are missing: rendered on demand
+        engine = pdf_generator.ReportEngine("DejaVuSans.ttf")
+        paper = engine.paper()
+        self.assertTrue(os.path.exists("output/eq_snr.png"))
+        self.assertTrue(os.path.exists("output/eq_lloyd.png"))
+
+        results = {"Sgr A*": physics.simulate_hole(4.0e6, 0.6, steps=500),
+                   "TON 618": physics.simulate_hole(6.6e10, 0.99, steps=500)}
+        reports = engine.catalog(results, output_dir="output/reports", processes=2)
+        self.assertEqual([os.path.basename(p) for p in reports], ["Sgr_A.pdf", "TON_618.pdf"])
+        for path in [paper, *reports]:
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(5), b"%PDF-")
+            self.assertLess(os.path.getsize(path), 400_000)
+
+if __name__ == '__main__':
+    unittest.main()
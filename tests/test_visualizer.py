@@ -0,0 +1,270 @@
+import os
+import tempfile
+import unittest
+import imageio.v2 as imageio
+import numpy as np
+from ali_integral.visualizer import (generate_starfield, apply_lensing, LensingEngine,
+                                    StarCatalog, lens_star_catalog, STAR_TINT,
+                                    apply_blueshift, to_uint8, quantize, apply_blueshift_lut)
+from ali_integral import config, visualizer, visualizer_eht
+from ali_integral.eht_imaging import (disk_intensity, render_tiled, render_shadow_hires, EXTENT,
+                                     ShadowField, perturbation_sweep, R_SHADOW_CLASSIC,
+                                     shadow_field, generate_shadow_image)
+from ali_integral.utils import parallel_map
+from ali_integral.visualizer_eht import EHTFrameRenderer
+from ali_integral.writers import GifStreamWriter, PngSequenceWriter, write_png_stream
+
+def legacy_disk_intensity(x, y, r_shadow):
+    # render_accretion_disk of the original generate_shadow_image, verbatim
+    # (reference for bit-identity)
+    X, Y = np.meshgrid(x, y)
+    R_impact = np.sqrt(X**2 + Y**2)
+
+    intensity = np.zeros_like(R_impact)
+    mask_light = R_impact > r_shadow
+    intensity[mask_light] = 10.0 / (R_impact[mask_light]**2)
+
+    ring_width = 0.5
+    mask_ring = (R_impact > r_shadow) & (R_impact < r_shadow + ring_width)
+    intensity[mask_ring] += 50.0
+
+    doppler = 1 + 0.5 * (X / np.sqrt(X**2 + Y**2 + 0.1))
+    intensity = intensity * doppler
+    return intensity
+
+class TestVisualizer(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(0)
+        self.universe = generate_starfield(160, 90, num_stars=400)
+
+    def test_lensing_engine_matches_apply_lensing(self):
+        engine = LensingEngine(160, 90)
+        for r in np.linspace(15, 2.05, 12):
+            expected, shadow = apply_lensing(self.universe, r)
+            view, shadow_r = engine.render(self.universe, r)
+            np.testing.assert_array_equal(view, expected)
+            self.assertEqual(shadow_r, shadow)
+        self.assertLessEqual(len(engine._maps), visualizer.MAP_CACHE)
+
+    def test_bilinear_lensing_preserves_shadow(self):
+        engine = LensingEngine(160, 90, mode="bilinear")
+        view, shadow = engine.render(self.universe, 8.0)
+        self.assertEqual(view.shape, self.universe.shape)
+        self.assertTrue(np.all(view[engine.radius_px.reshape(90, 160) < shadow] == 0))
+        self.assertLessEqual(view.max(), self.universe.max() + 1e-6)
+
+    def test_preview_frame_is_scaled_render(self):
+        # White sky: the black pixels of a frame are exactly the shadow
+        full = np.ones((360, 640, 3), dtype=np.float32)
+        fractions = {}
+        for lod in (1, 4):
+            frames = parallel_map(visualizer.render_frame, [15.0, 4.0], initializer=visualizer._init_frame_worker,
+                                  initargs=(visualizer.downsample(full, lod), 1.0 / lod))
+            fractions[lod] = [np.mean(np.all(f == 0, axis=-1)) for f, _ in frames]
+        self.assertLess(fractions[1][0], 0.3)
+        np.testing.assert_allclose(fractions[4], fractions[1], atol=0.02)
+
+    def test_star_catalog_forward_lensing(self):
+        catalog = StarCatalog.random(160, 90, num_stars=300, seed=3)
+        dense = catalog.to_image()
+        lit = np.flatnonzero(dense[..., 0].ravel())
+        np.testing.assert_array_equal(lit, np.unique(catalog.y.astype(int) * 160 + catalog.x.astype(int)))
+
+        frame, shadow = lens_star_catalog(catalog, 100.0)
+        radius = LensingEngine(160, 90).radius_px.reshape(90, 160)
+        self.assertTrue(np.all(frame[radius < shadow - 1] == 0))
+        # Each star contributes at most a primary and a secondary image
+        total = (catalog.brightness[:, None] * STAR_TINT).sum()
+        self.assertLessEqual(frame.sum(), 2 * total + 1e-6)
+        self.assertGreater(frame.sum(), 0)
+
+    def test_float32_inplace_and_lut_blueshift(self):
+        self.assertEqual(self.universe.dtype, np.float32)
+        reference = np.clip(self.universe.astype(np.float64) * 1.4 * [1 / 1.4, 1.0, 1.4], 0, 1)
+        reference = (reference * 255).astype(np.uint8)
+
+        r = 2.0 / (1.0 - 1.4**-2)  # intensity 1.4
+        buf = self.universe.copy()
+        out, intensity = apply_blueshift(buf, r, out=buf)
+        self.assertIs(out, buf)
+        self.assertAlmostEqual(intensity, 1.4)
+        self.assertLessEqual(np.abs(to_uint8(out).astype(int) - reference).max(), 1)
+
+        lut_frame, _ = apply_blueshift_lut(*quantize(self.universe), r)
+        self.assertEqual(lut_frame.dtype, np.uint8)
+        np.testing.assert_array_equal(lut_frame, to_uint8(out))
+
+        # The animation frames take the LUT path and match the float path
+        visualizer._init_frame_worker(self.universe)
+        try:
+            for r in (15.0, 4.0, 2.05):
+                view, _ = LensingEngine(160, 90).render(self.universe, r)
+                expected = to_uint8(apply_blueshift(view, r, out=view)[0])
+                np.testing.assert_array_equal(visualizer.render_frame(r)[0], expected)
+        finally:
+            visualizer._FRAME_STATE.clear()
+
+    def test_eht_renderer_reuses_figure(self):
+        renderer = EHTFrameRenderer(res=64)
+        fig = renderer.fig
+        first = renderer.render(0.0)
+        peak = renderer.render(np.pi / 2)
+        self.assertIs(renderer.fig, fig)
+        self.assertEqual(first.shape, peak.shape)
+        self.assertEqual(first.dtype, np.uint8)
+        self.assertFalse(np.array_equal(first, peak))
+        self.assertTrue(renderer.label.get_visible())
+
+    def test_parallel_frames_match_sequential(self):
+        distances = np.linspace(15, 2.05, 8)
+        args = dict(initializer=visualizer._init_frame_worker, initargs=(self.universe,))
+        sequential = [f for f, _ in parallel_map(visualizer.render_frame, distances, processes=1, **args)]
+        pooled = [f for f, _ in parallel_map(visualizer.render_frame, distances, processes=2, chunksize=3, **args)]
+        for a, b in zip(sequential, pooled):
+            np.testing.assert_array_equal(a, b)
+
+        tasks = [(t, None, 300) for t in np.linspace(0, 2 * np.pi, 4)]
+        args = dict(initializer=visualizer_eht._init_eht_worker, initargs=(48,))
+        sequential = list(parallel_map(visualizer_eht.render_eht_frame, tasks, processes=1, **args))
+        pooled = list(parallel_map(visualizer_eht.render_eht_frame, tasks, processes=2, **args))
+        for a, b in zip(sequential, pooled):
+            np.testing.assert_array_equal(a, b)
+
+    def test_in_process_render_releases_frame_state(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                visualizer.create_animation(lod=8)
+                self.assertEqual(os.listdir(config.PREVIEW_DIR), ["Vision_Theory_Simulation.gif"])
+                visualizer_eht.generate_eht_animation(lod=10)
+            finally:
+                os.chdir(cwd)
+        self.assertEqual(visualizer._FRAME_STATE, {})
+        self.assertEqual(visualizer_eht._RENDERER, {})
+
+    def test_streaming_writers(self):
+        frames = [to_uint8(apply_lensing(self.universe, r)[0]) for r in (15.0, 9.0, 9.0, 4.0)]
+        with tempfile.TemporaryDirectory() as tmp:
+            with PngSequenceWriter(os.path.join(tmp, "png", "f_{:02d}.png"), max_pending=1) as pngs:
+                for f in frames:
+                    pngs.append(f)
+            np.testing.assert_array_equal(imageio.imread(os.path.join(tmp, "png", "f_03.png")), frames[3])
+
+            for mode in [dict(), dict(palette="reuse"), dict(delta=True)]:
+                path = os.path.join(tmp, "anim.gif")
+                with GifStreamWriter(path, max_pending=2, **mode) as gif:
+                    for f in frames:
+                        gif.append(f)
+                decoded = np.asarray(imageio.mimread(path))[..., :3]
+                self.assertEqual(decoded.shape, (len(frames), 90, 160, 3))
+                # Few colours on a black sky: 256-colour quantization is close
+                self.assertLess(np.abs(decoded.astype(int) - np.asarray(frames)).mean(), 2.0)
+
+    def test_writers_copy_reused_frame_buffers(self):
+        frames = [to_uint8(apply_lensing(self.universe, r)[0]) for r in (30.0, 15.0)]
+        with tempfile.TemporaryDirectory() as tmp:
+            buffer = np.empty_like(frames[0])
+            path = os.path.join(tmp, "anim.gif")
+            with GifStreamWriter(path, max_pending=8) as gif, \
+                    PngSequenceWriter(os.path.join(tmp, "f_{:d}.png"), max_pending=8) as pngs:
+                for f in frames + [np.zeros_like(buffer)]:
+                    buffer[...] = f
+                    gif.append(buffer)
+                    pngs.append(buffer)
+            decoded = np.asarray(imageio.mimread(path))[..., :3]
+            self.assertGreater(decoded[1].max(), 0)
+            self.assertLess(np.abs(decoded[:2].astype(int) - np.asarray(frames)).mean(), 2.0)
+            for i, f in enumerate(frames):
+                np.testing.assert_array_equal(imageio.imread(os.path.join(tmp, f"f_{i}.png")), f)
+
+    def test_writers_remove_partial_output_on_error(self):
+        frame = to_uint8(apply_lensing(self.universe, 9.0)[0])
+
+        def bands():
+            yield frame[:40]
+            raise KeyboardInterrupt
+
+        with tempfile.TemporaryDirectory() as tmp:
+            gif_path = os.path.join(tmp, "anim.gif")
+            with self.assertRaises(RuntimeError):
+                with GifStreamWriter(gif_path, max_pending=1) as gif:
+                    gif.append(frame)
+                    gif.append(frame)
+                    raise RuntimeError("render failed")
+            self.assertTrue(gif._file.closed)
+
+            with self.assertRaises(RuntimeError):
+                with PngSequenceWriter(os.path.join(tmp, "png", "f_{:02d}.png"), max_pending=1) as pngs:
+                    pngs.append(frame)
+                    pngs.append(frame)
+                    raise RuntimeError("render failed")
+
+            png_path = os.path.join(tmp, "big.png")
+            with self.assertRaises(KeyboardInterrupt):
+                write_png_stream(png_path, 160, 90, bands())
+            with self.assertRaises(ValueError):
+                write_png_stream(png_path, 160, 90, [frame[:40]])
+
+            self.assertEqual(os.listdir(tmp), ["png"])
+            self.assertEqual(os.listdir(os.path.join(tmp, "png")), [])
+
+    def test_tiled_shadow_matches_full_render(self):
+        res = 100
+        axis = np.linspace(-EXTENT, EXTENT, res, dtype=np.float32)
+        full = disk_intensity(axis, axis, 5.3)
+        with tempfile.TemporaryDirectory() as tmp:
+            for processes in (1, 2):
+                tiled, (lo, hi) = render_tiled(5.3, res, os.path.join(tmp, "map.dat"), tile=37, processes=processes)
+                np.testing.assert_array_equal(tiled, full)
+                self.assertEqual((lo, hi), (full.min(), full.max()))
+                del tiled
+
+            path = render_shadow_hires(0.4, res=res, output_dir=tmp, tile=37)
+            png = imageio.imread(path)
+            self.assertEqual(png.shape, (res, res, 3))
+            self.assertFalse(os.path.exists(os.path.join(tmp, f"eht_shadow_{res}.dat")))
+
+    def test_shadow_batch_matches_single_renders(self):
+        axis = np.linspace(-EXTENT, EXTENT, 64, dtype=np.float32)
+        field = ShadowField(axis, axis)
+        # Plus a radius just below a pixel's float32 R that rounds up to it:
+        # the shadow edge must be decided in float32 on every path
+        edge = float(field.R_impact[40, 50])
+        # and the radius of a pixel where np.hypot rounds differently from
+        # the original sqrt(X**2 + Y**2)
+        X, Y = np.meshgrid(axis, axis)
+        differs = np.flatnonzero(np.hypot(X, Y) != np.sqrt(X**2 + Y**2))
+        ulp_edge = float(np.minimum(np.hypot(X, Y), np.sqrt(X**2 + Y**2)).flat[differs[0]])
+        radii = np.append(np.linspace(4.8, 6.0, 7), [np.nextafter(edge, 0.0), ulp_edge])
+        stack = field.render_batch(radii, chunk=3)
+        self.assertEqual(stack.shape, (9, 64, 64))
+        for r, image in zip(radii, stack):
+            expected = legacy_disk_intensity(axis, axis, float(r))
+            np.testing.assert_array_equal(image, expected)
+            np.testing.assert_array_equal(field.render(r), expected)
+            np.testing.assert_array_equal(disk_intensity(axis, axis, float(r)), expected)
+
+        np.testing.assert_array_equal(field.difference(R_SHADOW_CLASSIC), 0.0)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sweep.npy")
+            sweep = perturbation_sweep([0.0, 0.5, 1.0], res=64, path=path)
+            np.testing.assert_array_equal(np.load(path), sweep["images"])
+            del sweep["images"]
+        self.assertEqual(sweep["rms_deviation"][0], 0.0)
+        self.assertTrue(np.all(np.diff(sweep["rms_deviation"]) > 0))
+
+    def test_preview_level_of_detail(self):
+        coarse = visualizer.downsample(self.universe, 4)
+        self.assertEqual(coarse.shape, (22, 40, 3))
+        # Block max keeps every star of the full-resolution sky
+        self.assertEqual(coarse.max(), self.universe.max())
+        self.assertIs(visualizer.downsample(self.universe, 1), self.universe)
+
+        self.assertIs(shadow_field(50), shadow_field(50))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = generate_shadow_image(0.5, output_dir=tmp, lod=10)
+            self.assertTrue(os.path.exists(path))
+
+if __name__ == '__main__':
+    unittest.main()